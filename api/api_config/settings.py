@@ -26,6 +26,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     # Other packages
     "rest_framework",
@@ -88,6 +89,19 @@ DATABASES = {
 }
 
 
+# Cache config
+# Local memory by default, set 'CACHE_BACKEND' and 'CACHE_LOCATION' to share it between workers (Ex: Redis).
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='books-club'),
+    }
+}
+
+# Seconds a public feed response stays cached (it's also invalidated on every catalogue change)
+FEED_CACHE_TIMEOUT = config('FEED_CACHE_TIMEOUT', default=300, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -135,15 +149,15 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Custom user model and backend to authenticate user based on email
 AUTH_USER_MODEL = 'users.User'
+# Email logins only (a single lookup and password hash per login attempt)
 AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',
     'users.auth_backends.EmailBackend'
 ]
 
 # REST Framework config
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.LazyJWTAuthentication',
     )
 }
 
@@ -171,6 +185,7 @@ SIMPLE_JWT = {
 
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_REFRESH_SERIALIZER': 'users.token_blacklist.FilteredTokenRefreshSerializer',
     'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
 
     'JTI_CLAIM': 'jti',
@@ -188,4 +203,55 @@ EMAIL_PASSWORD = 587
 EMAIL_USE_TLS = True
 
 EMAIL_HOST_USER = config('EMAIL_USER')
-EMAIL_HOST_PASSWORD = config('EMAIL_PASSWORD')
\ No newline at end of file
+EMAIL_HOST_PASSWORD = config('EMAIL_PASSWORD')
+
+# Image upload config (concurrent uploads per process and timeout of each upload in seconds)
+IMAGE_UPLOAD_WORKERS = config('IMAGE_UPLOAD_WORKERS', default=4, cast=int)
+IMAGE_UPLOAD_TIMEOUT = config('IMAGE_UPLOAD_TIMEOUT', default=30, cast=int)
+
+# Password hashing config (number of passwords hashed at once per process, off the request thread)
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', default=2, cast=int)
+
+# Pagination config (cursor pagination of list endpoints)
+PAGE_SIZE = config('PAGE_SIZE', default=20, cast=int)
+MAX_PAGE_SIZE = config('MAX_PAGE_SIZE', default=100, cast=int)
+
+# Number of rows fetched and written at once by streaming list endpoints
+STREAM_CHUNK_SIZE = config('STREAM_CHUNK_SIZE', default=500, cast=int)
+
+# Number of precomputed book recommendations kept per user
+RECOMMENDATIONS_PER_USER = config('RECOMMENDATIONS_PER_USER', default=100, cast=int)
+
+# Number of titles/authors suggested while typing a search
+SUGGESTIONS_LIMIT = config('SUGGESTIONS_LIMIT', default=10, cast=int)
+
+# Image jobs config (attempts before a job is failed, first retry delay in seconds, doubled on each retry)
+IMAGE_JOB_MAX_ATTEMPTS = config('IMAGE_JOB_MAX_ATTEMPTS', default=5, cast=int)
+IMAGE_JOB_RETRY_DELAY = config('IMAGE_JOB_RETRY_DELAY', default=30, cast=int)
+
+# Uploaded images are resized and re-encoded to this format ('WEBP' or 'JPEG') and quality
+IMAGE_FORMAT = config('IMAGE_FORMAT', default='WEBP').upper()
+IMAGE_QUALITY = config('IMAGE_QUALITY', default=80, cast=int)
+
+# Storage of uploaded images ('api_config.utils.storage.CloudinaryStorage' or 'api_config.utils.storage.LocalStorage')
+MEDIA_STORAGE = config('MEDIA_STORAGE', default='api_config.utils.storage.CloudinaryStorage')
+
+# Local storage: files are saved under MEDIA_ROOT and served from MEDIA_URL (absolute URL if the client is on another origin)
+MEDIA_ROOT = config('MEDIA_ROOT', default=os.path.join(BASE_DIR, "media"))
+MEDIA_URL = config('MEDIA_URL', default='/media/')
+
+# Number of rows validated and inserted at once by the bulk import of books
+IMPORT_BATCH_SIZE = config('IMPORT_BATCH_SIZE', default=1000, cast=int)
+
+# Bloom filter in front of the token blacklist (seconds between rebuilds of the filter of each process,
+# and between reads of the tokens blacklisted since, Ex: by other workers)
+TOKEN_BLACKLIST_FILTER = config('TOKEN_BLACKLIST_FILTER', default=True, cast=bool)
+TOKEN_BLACKLIST_FILTER_REFRESH = config('TOKEN_BLACKLIST_FILTER_REFRESH', default=300, cast=int)
+TOKEN_BLACKLIST_FILTER_SYNC = config('TOKEN_BLACKLIST_FILTER_SYNC', default=1, cast=float)
+
+# Number of token ids deleted at once by 'prune_tokens'
+TOKEN_PRUNING_BATCH_SIZE = config('TOKEN_PRUNING_BATCH_SIZE', default=1000, cast=int)
+
+# Users loaded by the JWT authentication are cached per process (seconds, and maximum number of users)
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=60, cast=int)
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=1000, cast=int)
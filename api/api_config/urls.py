@@ -1,5 +1,12 @@
+from urllib.parse import urlparse
+
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+from django.views.static import serve
+
+from users.views import tags_controller
+from api_config.views import monitoring_stats_controller
 
 urlpatterns = [
     # Default admin functionalities
@@ -13,6 +20,24 @@ urlpatterns = [
         path("books/", include("books.urls")),
 
         # Offers API
-        path("offers/", include("offers.urls"))
+        path("offers/", include("offers.urls")),
+
+        # GET all the tags (book categories / user interests)
+        # Ex: /api/tags/
+        path("tags/", tags_controller, name="tags_controller"),
+
+        # GET counters of the API internals (admin only)
+        # Ex: /api/monitoring/stats/
+        path("monitoring/stats/", monitoring_stats_controller, name="monitoring_stats_controller"),
     ]))
-]
\ No newline at end of file
+]
+
+# Images saved by the local storage backend are served by Django itself.
+if settings.MEDIA_STORAGE == "api_config.utils.storage.LocalStorage":
+    urlpatterns.append(
+        re_path(
+            r"^%s(?P<path>.*)$" % urlparse(settings.MEDIA_URL).path.lstrip("/"),
+            serve,
+            {"document_root": settings.MEDIA_ROOT},
+        )
+    )
@@ -0,0 +1,69 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.db import transaction
+
+
+class Rollback(Exception):
+    """
+      Raised at the end of 'rolled_back' to undo everything a benchmark wrote.
+    """
+
+
+@contextmanager
+def rolled_back():
+    """
+      Run a benchmark in a transaction that is always rolled back, so its rows never stay in the database.
+    """
+
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback()
+    except Rollback:
+        pass
+
+
+def measure(function, *args):
+    """
+      Run 'function(*args)' twice: once timed, once with memory tracing (which slows it down).
+
+      Returns: (result, seconds, peak memory allocated by Python in bytes)
+    """
+
+    started = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        function(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, seconds, peak
+
+
+def percentile(values, percent):
+    """
+      Value under which 'percent' % of 'values' fall (nearest rank).
+    """
+
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))]
+
+
+def create_benchmark_user(email):
+    """
+      Create a user (and the genders it needs) for a benchmark, inside 'rolled_back' (or deleted by the benchmark).
+    """
+
+    Gender = apps.get_model("users", "Gender")
+    User = apps.get_model("users", "User")
+
+    for name in ["male", "female", "others", "prefer not to say"]:
+        Gender.objects.get_or_create(name=name)
+    return User.objects.create_user("Benchmark", "User", email, "benchmark-password")
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Cache keys
+CATALOGUE_VERSION_KEY = "catalogue-version"
+FEED_CACHE_HITS_KEY = "feed-cache-hits"
+FEED_CACHE_MISSES_KEY = "feed-cache-misses"
+
+
+def get_version(key):
+    """
+       Get the current version saved in cache under 'key' (created if missing).
+    """
+
+    version = cache.get(key)
+    if version is None:
+        # start from the current time, so a version lost by cache eviction never repeats an older one.
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    """
+       Move the version saved in cache under 'key' forward.
+    """
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        # version isn't in the cache yet (or was evicted), creating it is a new version.
+        get_version(key)
+
+
+def get_catalogue_version():
+    """
+       Get the current version of the catalogue (books shown in the feed).
+    """
+
+    return get_version(CATALOGUE_VERSION_KEY)
+
+
+def bump_catalogue_version():
+    """
+       Invalidate every cached feed response, call it after any change to what the feed shows.
+    """
+
+    bump_version(CATALOGUE_VERSION_KEY)
+
+
+def increment_counter(key, amount=1):
+    """
+       Increment a monitoring counter saved in cache by 'amount'.
+    """
+
+    if not cache.add(key, amount, timeout=None):
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            cache.add(key, amount, timeout=None)
+
+
+def get_feed_cache_key(query_params, *validators):
+    """
+       Get the cache key of a feed response from the normalized 'query_params' and catalogue version.
+
+       Params:
+         query_params --> query params of the request ('QueryDict')
+         validators --> values read from the database that change with the feed (Ex: latest change of the books)
+    """
+
+    # same params in any order (or repeated values in any order) give the same key.
+    params = sorted((key, sorted(values)) for key, values in query_params.lists())
+    digest = hashlib.sha1(json.dumps([params, [str(value) for value in validators]]).encode()).hexdigest()
+
+    return f"feed:{get_catalogue_version()}:{digest}"
+
+
+def get_cached_feed(cache_key):
+    """
+       Get a cached feed response (or None), and count the cache hit/miss.
+    """
+
+    data = cache.get(cache_key)
+    increment_counter(FEED_CACHE_MISSES_KEY if data is None else FEED_CACHE_HITS_KEY)
+    return data
+
+
+def cache_feed(cache_key, data):
+    """
+       Save a feed response in cache.
+    """
+
+    cache.set(cache_key, data, timeout=settings.FEED_CACHE_TIMEOUT)
+
+
+def get_feed_cache_stats():
+    """
+       Get the hit/miss counters of the feed cache.
+    """
+
+    hits = cache.get(FEED_CACHE_HITS_KEY, 0)
+    misses = cache.get(FEED_CACHE_MISSES_KEY, 0)
+    total = hits + misses
+
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else 0,
+        "catalogue_version": get_catalogue_version(),
+    }
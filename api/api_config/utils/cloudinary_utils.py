@@ -1,62 +1,169 @@
-from api_config.cloudinary_config import *
+import io
+import posixpath
+import uuid
 
-# Utilty functions to work with cloudinary
-def upload_image(image, folder_name):
+from django.conf import settings
+from PIL import Image as PILImage, ImageOps, UnidentifiedImageError
+
+from api_config.utils.storage import ImageUploadError, get_storage
+
+# Longest side (in px) of each variant of an uploaded image.
+# 'full' is stored as the image itself, the others as '<filename>_<variant>'.
+IMAGE_VARIANTS = {"thumbnail": 320, "medium": 800, "full": 1600}
+
+
+class InvalidImageError(Exception):
+    """
+      Raised when an uploaded file can't be decoded as an image.
+    """
+
+
+# Utilty functions to work with uploaded images (stored by the 'MEDIA_STORAGE' backend)
+def encode_image_variants(image):
+    """
+      Decode 'image', strip its metadata (EXIF) and re-encode it once per 'IMAGE_VARIANTS' size.
+
+      Returns: dict of variant name --> encoded image (file-like object, 'IMAGE_FORMAT').
+
+      Params:
+        image --> uploaded image (file-like object)
+    """
+
+    try:
+        with PILImage.open(image) as original:
+            # JPEGs are decoded at a reduced scale when they are much larger than the biggest variant.
+            original.draft("RGB", (IMAGE_VARIANTS["full"], IMAGE_VARIANTS["full"]))
+
+            # rotate the pixels as the camera intended, the orientation tag is dropped with the EXIF.
+            decoded = ImageOps.exif_transpose(original)
+            icc_profile = original.info.get("icc_profile", None)
+    except (UnidentifiedImageError, OSError) as error:
+        raise InvalidImageError("Couldn't decode image") from error
+
+    has_alpha = decoded.mode in ("RGBA", "LA") or "transparency" in decoded.info
+    if settings.IMAGE_FORMAT == "WEBP" and has_alpha:
+        decoded = decoded.convert("RGBA")
+    elif has_alpha:
+        # JPEG has no alpha channel, transparent pixels become white.
+        background = PILImage.new("RGB", decoded.size, "white")
+        background.paste(decoded.convert("RGBA"), mask=decoded.convert("RGBA"))
+        decoded = background
+    else:
+        decoded = decoded.convert("RGB")
+
+    variants = {}
+    for name, size in IMAGE_VARIANTS.items():
+        variant = decoded.copy()
+        variant.thumbnail((size, size), PILImage.Resampling.LANCZOS)
+
+        # only the color profile is kept, no other metadata is written.
+        encoded = io.BytesIO()
+        variant.save(
+            encoded,
+            format=settings.IMAGE_FORMAT,
+            quality=settings.IMAGE_QUALITY,
+            icc_profile=icc_profile,
+        )
+        encoded.seek(0)
+
+        # storage backends take the extension from the name.
+        encoded.name = f"{name}.{settings.IMAGE_FORMAT.lower()}"
+        variants[name] = encoded
+
+    return variants
+
+
+def get_variant_ids(public_id):
+    """
+      Public ids of the full image 'public_id' and of its smaller variants.
+    """
+
+    return [public_id] + [f"{public_id}_{name}" for name in IMAGE_VARIANTS if name != "full"]
+
+
+def upload_images(images, folder_name):
     """
-      Upload a single 'image' to cloud under 'folder_name'.
+      Resize and re-encode 'images' (see 'encode_image_variants') and upload all their variants concurrently.
+
+      Returns: list (same order as 'images') of dicts with 'url' and 'filename' of the full image,
+      'thumbnail_url' and 'medium_url'. If any upload fails, nothing is left in storage and
+      'ImageUploadError' is raised.
+
+      Params:
+        images --> list of images (type: list of uploaded files)
+        folder_name --> folder under which 'images' are stored
+    """
+
+    files = []
+    for image in images:
+        public_id = posixpath.join("books-api", folder_name, uuid.uuid4().hex)
+        variants = encode_image_variants(image)
+        files += zip([variants["full"], variants["thumbnail"], variants["medium"]], get_variant_ids(public_id))
+
+    urls = get_storage().upload_many(files)
+
+    allImages = []
+    for i in range(0, len(files), 3):
+        allImages.append(
+            {
+                "url": urls[i],
+                "filename": files[i][1],
+                "thumbnail_url": urls[i + 1],
+                "medium_url": urls[i + 2],
+            }
+        )
+    return allImages
+
+
+def upload_image_variants(image, folder_name):
+    """
+      Upload a single 'image' with its variants (see 'upload_images').
       
       Params:
         image --> single 'image' to upload
-        folder_name --> folder under which 'image' is stored in cloud
+        folder_name --> folder under which 'image' is stored
     """
-    
 
-    res = cloudinary.uploader.upload(
-        image, **cloudinary_media_upload_options, folder="books-api/" + folder_name
-    )
-    return res
+    return upload_images([image], folder_name)[0]
 
 
 def upload_multiple_book_images(images, book, folder_name, number_of_images_to_upload=4):
     """
-     Upload multiple 'images' to cloud under 'folder_name'.
+     Upload multiple 'images' (with their variants) to storage under 'folder_name', concurrently.
+
+     Images are returned in the same order they were sent. If any upload fails (or times out),
+     all the images of the batch are deleted from storage and 'ImageUploadError' is raised.
      
      Params:
-        images --> list of images (type: list of 'bytes')
+        images --> list of images (type: list of uploaded files)
         book --> book to which 'images' belong
-        folder_name --> folder under which 'images' are stored in cloud
-        number_of_images_to_upload --> number of images allowed to upload to cloud
+        folder_name --> folder under which 'images' are stored
+        number_of_images_to_upload --> number of images allowed to upload
     """
 
-    allImages = []
-    for image in images[:number_of_images_to_upload]:
-        # upload each image to cloud.
-        image_upload_response = upload_image(image, folder_name)
-        imageData = {
-            "book": book.id,
-            "url": image_upload_response["secure_url"],
-            "filename": image_upload_response["public_id"],
-        }
-        allImages.append(imageData)
-    return allImages
+    try:
+        allImages = upload_images(images[:number_of_images_to_upload], folder_name)
+    except InvalidImageError as error:
+        raise ImageUploadError("Couldn't decode images") from error
 
-def delete_image(public_id):
+    return [{"book": book.id, **imageData} for imageData in allImages]
+
+def delete_images(public_ids):
     """
-       Delete a 'image' from cloud with 'public_id'
+       Delete images (and their variants) from storage with a single bulk call.
 
        Params:
-         public_id --> i.e., 'filename' of the image to identify it uniquely.
+         public_ids --> i.e., 'filename' of the images to identify them uniquely.
     """
-    res = cloudinary.uploader.destroy(public_id)
-    return res
 
-def delete_multiple_images(images):
+    # images uploaded before variants existed have none (ignored).
+    get_storage().delete_many([variant_id for public_id in public_ids for variant_id in get_variant_ids(public_id)])
+
+def delete_image(public_id):
     """
-       Delete multiple 'images' from cloud.
+       Delete a 'image' (and its variants) from storage with 'public_id'
 
        Params:
-         images --> list of 'Image' object to delete images from cloud and DB.
+         public_id --> i.e., 'filename' of the image to identify it uniquely.
     """
-    
-    for image in images:
-        delete_image(image.filename)
\ No newline at end of file
+    delete_images([public_id])
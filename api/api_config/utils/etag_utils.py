@@ -0,0 +1,37 @@
+import hashlib
+
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    """
+       Build a strong 'ETag' from cheap validators (versions, timestamps, counts), not from the response body.
+    """
+
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def is_not_modified(req, etag):
+    """
+       Check if the client already has the representation with 'etag' (If-None-Match header).
+    """
+
+    if_none_match = req.headers.get("If-None-Match", None)
+    if not if_none_match:
+        return False
+
+    # 'If-None-Match' uses weak comparison.
+    etags = [tag.removeprefix("W/") for tag in parse_etags(if_none_match)]
+    return "*" in etags or etag in etags
+
+
+def not_modified_response(etag):
+    """
+       '304 Not Modified' response with the current 'etag'.
+    """
+
+    response = Response(status=304)
+    response["ETag"] = etag
+    return response
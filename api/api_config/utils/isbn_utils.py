@@ -0,0 +1,58 @@
+import re
+
+# Characters allowed between digits of an ISBN (Ex: '978-0-306-40615-7', '0 306 40615 2')
+ISBN_SEPARATORS = re.compile(r"[\s\-]")
+
+
+def is_valid_isbn10(isbn):
+    """
+       Check format and checksum of an ISBN-10 (last digit can be 'X' --> 10).
+    """
+
+    if not re.fullmatch(r"\d{9}[\dX]", isbn):
+        return False
+
+    digits = [10 if char == "X" else int(char) for char in isbn]
+    return sum((10 - i) * digit for i, digit in enumerate(digits)) % 11 == 0
+
+
+def is_valid_isbn13(isbn):
+    """
+       Check format and checksum of an ISBN-13.
+    """
+
+    if not re.fullmatch(r"97[89]\d{10}", isbn):
+        return False
+
+    return sum((3 if i % 2 else 1) * int(char) for i, char in enumerate(isbn)) % 10 == 0
+
+
+def isbn10_to_isbn13(isbn):
+    """
+       Convert a valid ISBN-10 to ISBN-13 ('978' prefix and new check digit).
+    """
+
+    isbn = "978" + isbn[:9]
+    check_digit = (10 - sum((3 if i % 2 else 1) * int(char) for i, char in enumerate(isbn)) % 10) % 10
+    return isbn + str(check_digit)
+
+
+def normalize_isbn(value):
+    """
+       Get the canonical form (ISBN-13, digits only) of an ISBN-10 or ISBN-13.
+
+       Returns: canonical ISBN, or None if 'value' is not a valid ISBN.
+    """
+
+    if not value:
+        return None
+
+    isbn = ISBN_SEPARATORS.sub("", str(value)).upper()
+    if isbn.startswith("ISBN"):
+        isbn = isbn[4:].lstrip(":")
+
+    if is_valid_isbn13(isbn):
+        return isbn
+    if is_valid_isbn10(isbn):
+        return isbn10_to_isbn13(isbn)
+    return None
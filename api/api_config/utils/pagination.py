@@ -0,0 +1,120 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    """
+      Raised when a 'cursor' sent by the client can't be decoded.
+    """
+
+
+def get_page_size(query_params):
+    """
+       Get the page size requested by the client, capped at 'MAX_PAGE_SIZE'.
+
+       Params:
+         query_params --> query params of the request ('page_size' is optional)
+    """
+
+    try:
+        page_size = int(query_params.get("page_size", settings.PAGE_SIZE))
+    except (TypeError, ValueError):
+        page_size = settings.PAGE_SIZE
+
+    return max(1, min(page_size, settings.MAX_PAGE_SIZE))
+
+
+def encode_cursor(values):
+    """
+       Encode the keyset 'values' of the last row of a page into an opaque cursor.
+    """
+
+    raw = json.dumps([str(value) for value in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor, fields):
+    """
+       Decode an opaque 'cursor' back into the keyset values.
+
+       Params:
+         cursor --> cursor sent by the client
+         fields --> list of model fields (or annotations) used as the keyset
+    """
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+
+        # one string per keyset field (see 'encode_cursor').
+        if not isinstance(values, list) or len(values) != len(fields):
+            raise InvalidCursor()
+        if not all(isinstance(value, str) for value in values):
+            raise InvalidCursor()
+
+        return [field.to_python(value) for field, value in zip(fields, values)]
+    except (ValueError, TypeError, AttributeError, ValidationError) as e:
+        raise InvalidCursor() from e
+
+
+def keyset_filter(names, values):
+    """
+       Build the filter selecting rows strictly after the cursor, for a keyset sorted in descending order.
+
+       Ex: (created_on, id) --> created_on < c OR (created_on = c AND id < i)
+    """
+
+    condition = Q()
+    for i, name in enumerate(names):
+        equal_prefix = {names[j]: values[j] for j in range(i)}
+        condition |= Q(**equal_prefix, **{f"{name}__lt": values[i]})
+    return condition
+
+
+def paginate_by_cursor(queryset, query_params, keyset=("created_on", "id")):
+    """
+       Keyset (cursor) pagination, newest rows first.
+
+       Rows are selected with a 'WHERE' on the keyset instead of 'OFFSET', so every page costs the same
+       and rows inserted while the client is scrolling don't shift the pages.
+
+       Params:
+         queryset --> queryset to paginate
+         query_params --> query params of the request ('cursor' and 'page_size' are optional)
+         keyset --> unique ordering of the rows (last name must be unique, Ex: 'id')
+
+       Returns: (rows of the page, cursor of the next page or None, has_more)
+    """
+
+    page_size = get_page_size(query_params)
+    queryset = queryset.order_by(*[f"-{name}" for name in keyset])
+
+    cursor = query_params.get("cursor", None)
+    if cursor:
+        fields = [get_keyset_field(queryset, name) for name in keyset]
+        queryset = queryset.filter(keyset_filter(keyset, decode_cursor(cursor, fields)))
+
+    # fetch one extra row to know if there's a next page.
+    rows = list(queryset[: page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    next_cursor = None
+    if has_more:
+        last_row = rows[-1]
+        next_cursor = encode_cursor([getattr(last_row, name) for name in keyset])
+
+    return rows, next_cursor, has_more
+
+
+def get_keyset_field(queryset, name):
+    """
+       Get the field used to parse cursor values of 'name' (model field or annotation).
+    """
+
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    return queryset.model._meta.get_field(name)
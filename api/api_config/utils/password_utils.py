@@ -0,0 +1,94 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import cache
+
+from api_config.utils.cache_utils import increment_counter
+
+# Shared by all requests, so a process never hashes more than 'PASSWORD_HASHING_WORKERS' passwords at once
+# (PBKDF2 releases the GIL, so the hashes run in parallel and the other requests of the process keep running).
+hashing_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASHING_WORKERS, thread_name_prefix="password-hashing"
+)
+
+# Cache keys of the counters of password hashing
+PASSWORD_HASHES_KEY = "password-hashes"
+PASSWORD_HASHING_MS_KEY = "password-hashing-ms"
+PASSWORD_HASHING_WAIT_MS_KEY = "password-hashing-wait-ms"
+
+
+def run_hashing(function, *args):
+    """
+       Run 'function(*args)' in the hashing pool and wait for its result, counting time spent waiting and hashing.
+    """
+
+    submitted = time.monotonic()
+
+    def timed():
+        started = time.monotonic()
+        try:
+            return function(*args)
+        finally:
+            finished = time.monotonic()
+            increment_counter(PASSWORD_HASHES_KEY)
+            increment_counter(PASSWORD_HASHING_WAIT_MS_KEY, round((started - submitted) * 1000))
+            increment_counter(PASSWORD_HASHING_MS_KEY, round((finished - started) * 1000))
+
+    return hashing_executor.submit(timed).result()
+
+
+def hash_password(password):
+    """
+       Hash a raw password (Ex: to save it in 'user.password') in the hashing pool.
+    """
+
+    return run_hashing(make_password, password)
+
+
+def verify_password(user, password):
+    """
+       Check a raw password against the saved hash of 'user' in the hashing pool.
+
+       If the hash uses outdated parameters (Ex: fewer PBKDF2 iterations), it's upgraded and saved.
+    """
+
+    encoded = user.password
+    upgraded = []
+
+    # the new hash is computed in the pool, but saved on the request thread (with its database connection).
+    def setter(raw_password):
+        upgraded.append(make_password(raw_password))
+
+    is_correct = run_hashing(check_password, password, encoded, setter)
+
+    if upgraded:
+        user.password = upgraded[0]
+        user.save(update_fields=["password"])
+
+    return is_correct
+
+
+def run_default_hasher(password):
+    """
+       Hash 'password' once (result unused), so a login with an unknown email takes as long as a wrong password.
+    """
+
+    run_hashing(make_password, password)
+
+
+def get_password_hashing_stats():
+    """
+       Get the counters of password hashing (number of hashes, average time waiting for the pool and hashing).
+    """
+
+    hashes = cache.get(PASSWORD_HASHES_KEY, 0)
+    wait_ms = cache.get(PASSWORD_HASHING_WAIT_MS_KEY, 0)
+    hashing_ms = cache.get(PASSWORD_HASHING_MS_KEY, 0)
+
+    return {
+        "hashes": hashes,
+        "avg_wait_ms": round(wait_ms / hashes, 1) if hashes else 0,
+        "avg_hashing_ms": round(hashing_ms / hashes, 1) if hashes else 0,
+    }
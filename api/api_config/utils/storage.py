@@ -0,0 +1,142 @@
+import glob
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Shared by all requests, so a process never uploads more than 'IMAGE_UPLOAD_WORKERS' files at once.
+upload_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_UPLOAD_WORKERS, thread_name_prefix="image-upload"
+)
+
+
+class ImageUploadError(Exception):
+    """
+      Raised when some of the files couldn't be uploaded (the uploaded ones are deleted).
+    """
+
+
+class ImageDeleteError(Exception):
+    """
+      Raised when some of the files couldn't be deleted.
+    """
+
+
+class MediaStorage(ABC):
+    """
+      Where uploaded media is stored, files are identified by a 'public_id' (path without extension).
+
+      Backends implement 'upload' and 'delete_many', the others are built on top of them.
+    """
+
+    @abstractmethod
+    def upload(self, file, public_id):
+        """
+          Store 'file' (file-like object) as 'public_id'.
+
+          Returns: URL of the stored file.
+        """
+
+    def upload_many(self, files):
+        """
+          Store '(file, public_id)' pairs concurrently.
+
+          Returns: URLs of the stored files, in the same order as 'files'.
+          If any upload fails (or times out), the uploaded files are deleted and 'ImageUploadError' is raised.
+        """
+
+        futures = [upload_executor.submit(self.upload, file, public_id) for file, public_id in files]
+        wait(futures)
+
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        if errors:
+            self.delete_many(
+                [public_id for (_, public_id), future in zip(files, futures) if future.exception() is None]
+            )
+            raise ImageUploadError(f"Couldn't upload {len(errors)} of {len(futures)} files") from errors[0]
+
+        return [future.result() for future in futures]
+
+    def delete(self, public_id):
+        """
+          Delete the file stored as 'public_id' (missing files are ignored).
+        """
+
+        self.delete_many([public_id])
+
+    @abstractmethod
+    def delete_many(self, public_ids):
+        """
+          Delete the files stored as 'public_ids' (missing files are ignored).
+        """
+
+
+class CloudinaryStorage(MediaStorage):
+    """
+      Files stored in Cloudinary.
+    """
+
+    # maximum number of public ids deleted by a single API call.
+    DELETE_BATCH_SIZE = 100
+
+    def __init__(self):
+        # credentials are only required when this backend is used.
+        from api_config.cloudinary_config import cloudinary
+
+        self.cloudinary = cloudinary
+
+    def upload(self, file, public_id):
+        res = self.cloudinary.uploader.upload(
+            file,
+            public_id=public_id,
+            resource_type="image",
+            timeout=settings.IMAGE_UPLOAD_TIMEOUT,
+        )
+        return res["secure_url"]
+
+    def delete_many(self, public_ids):
+        for start in range(0, len(public_ids), self.DELETE_BATCH_SIZE):
+            res = self.cloudinary.api.delete_resources(public_ids[start : start + self.DELETE_BATCH_SIZE])
+
+            failed = {
+                public_id: status
+                for public_id, status in res.get("deleted", {}).items()
+                if status not in ("deleted", "not_found")
+            }
+            if failed:
+                raise ImageDeleteError(f"Couldn't delete files: {failed}")
+
+
+class LocalStorage(MediaStorage):
+    """
+      Files stored under 'MEDIA_ROOT' and served from 'MEDIA_URL' (no network, for development and load tests).
+    """
+
+    def upload(self, file, public_id):
+        # extension of the file name (Ex: 'thumbnail.webp'), so the file is served with its content type.
+        extension = os.path.splitext(getattr(file, "name", "") or "")[1]
+        path = os.path.join(settings.MEDIA_ROOT, public_id + extension)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as stored:
+            stored.write(file.read())
+
+        return settings.MEDIA_URL + public_id + extension
+
+    def delete_many(self, public_ids):
+        for public_id in public_ids:
+            path = os.path.join(settings.MEDIA_ROOT, public_id)
+            for stored in glob.glob(glob.escape(path)) + glob.glob(glob.escape(path) + ".*"):
+                os.remove(stored)
+
+
+@lru_cache(maxsize=None)
+def get_storage():
+    """
+      Storage backend of the process, selected by the 'MEDIA_STORAGE' setting (dotted path of the class).
+    """
+
+    return import_string(settings.MEDIA_STORAGE)()
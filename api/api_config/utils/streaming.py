@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+
+
+def stream_json_list(queryset, serializer_class, key, chunk_size=None):
+    """
+       Stream '{"data": {key: [...]}}' row by row, so memory doesn't grow with the number of rows.
+
+       Output is the same bytes 'Response' renders for the whole list with 'JSONRenderer'.
+
+       Params:
+         queryset --> rows to serialize (prefetches are done per chunk)
+         serializer_class --> serializer of a single row
+         key --> key of the list in the response
+         chunk_size --> number of rows fetched from DB (and written) at once
+    """
+
+    chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+    renderer = JSONRenderer()
+
+    # fields are built once and reused for every row.
+    serializer = serializer_class()
+
+    # render the wrapper object once and write the rows in place of the empty list.
+    prefix, suffix = renderer.render({"data": {key: []}}).split(b"[]", 1)
+
+    def render_rows():
+        yield prefix + b"["
+
+        rows = []
+        separator = b""
+        for row in queryset.iterator(chunk_size=chunk_size):
+            rows.append(renderer.render(serializer.to_representation(row)))
+
+            if len(rows) == chunk_size:
+                yield separator + b",".join(rows)
+                separator = b","
+                rows = []
+
+        if rows:
+            yield separator + b",".join(rows)
+
+        yield b"]" + suffix
+
+    return StreamingHttpResponse(render_rows(), status=200, content_type="application/json")
@@ -0,0 +1,25 @@
+from rest_framework.response import Response
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+
+from users.token_blacklist import get_blacklist_filter_stats, get_token_pruning_stats
+from api_config.utils.m2m_utils import get_m2m_update_stats
+from api_config.utils.password_utils import get_password_hashing_stats
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def monitoring_stats_controller(req):
+    # GET counters of many-to-many updates, password hashing, token blacklist checks and the last pruning of
+    # expired tokens (for monitoring).
+    return Response(
+        data={
+            "data": {
+                "m2m_updates": get_m2m_update_stats(),
+                "password_hashing": get_password_hashing_stats(),
+                "token_blacklist": get_blacklist_filter_stats(),
+                "token_pruning": get_token_pruning_stats(),
+            }
+        },
+        status=200,
+    )
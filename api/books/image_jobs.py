@@ -0,0 +1,140 @@
+import io
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from books.models import Book, Image, ImageJob
+from api_config.utils.cache_utils import bump_catalogue_version
+from api_config.utils.cloudinary_utils import InvalidImageError, delete_image, delete_images, upload_image_variants
+
+# Maximum number of ready deletions run by a single bulk call.
+DELETE_BATCH_SIZE = 100
+
+
+def enqueue_book_images(book, images, folder_name):
+    """
+       Spool 'images' of the 'book' to DB, to be uploaded by the 'process_image_jobs' worker.
+
+       Params:
+         images --> list of uploaded files (type: 'UploadedFile')
+         book --> book to which 'images' belong
+         folder_name --> folder under which 'images' are stored in cloud
+    """
+
+    ImageJob.objects.bulk_create(
+        [
+            ImageJob(action=ImageJob.UPLOAD, book=book, content=image.read(), folder_name=folder_name)
+            for image in images
+        ]
+    )
+
+
+def enqueue_image_deletes(images):
+    """
+       Queue the deletion of 'images' (with their variants) from storage, run by the 'process_image_jobs' worker.
+
+       Params:
+         images --> list of 'Image' objects whose files are deleted from storage
+    """
+
+    ImageJob.objects.bulk_create(
+        [ImageJob(action=ImageJob.DELETE, filename=image.filename) for image in images]
+    )
+
+
+def run_upload(job):
+    """
+       Upload the spooled image of 'job' (with its variants) and save it as an image of its book.
+    """
+
+    res = upload_image_variants(io.BytesIO(bytes(job.content)), job.folder_name)
+    try:
+        with transaction.atomic():
+            Image.objects.create(book_id=job.book_id, **res)
+    except Exception:
+        # do not leave an image in storage that no book points to.
+        delete_image(res["filename"])
+        raise
+
+
+def run_deletes(jobs):
+    """
+       Delete the images 'jobs' point to from storage, with a single bulk call.
+    """
+
+    delete_images([job.filename for job in jobs])
+
+
+def retry_or_fail(job, error):
+    """
+       Schedule 'job' again with exponential backoff, or mark it 'failed' when it is out of attempts.
+    """
+
+    job.attempts += 1
+    job.last_error = repr(error)
+
+    # a file that is not an image will never upload.
+    if job.attempts >= settings.IMAGE_JOB_MAX_ATTEMPTS or isinstance(error, InvalidImageError):
+        job.status = ImageJob.FAILED
+    else:
+        delay = settings.IMAGE_JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+        job.run_after = timezone.now() + timedelta(seconds=delay)
+
+    job.save(update_fields=["attempts", "last_error", "status", "run_after"])
+
+
+def process_next_job():
+    """
+       Run the oldest job that is ready (with other ready deletions, batched), skipping jobs locked by other workers.
+
+       Returns: (jobs run, error) --> no jobs if none is ready, error is None if the jobs finished.
+    """
+
+    with transaction.atomic():
+        # the rows stay locked until the jobs are finished, a crashed worker leaves them 'pending'.
+        ready = (
+            ImageJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ImageJob.PENDING, run_after__lte=timezone.now())
+            .order_by("run_after", "id")
+        )
+        job = ready.first()
+        if job is None:
+            return [], None
+
+        jobs = [job]
+        if job.action == ImageJob.DELETE:
+            jobs += ready.filter(action=ImageJob.DELETE).exclude(pk=job.pk)[: DELETE_BATCH_SIZE - 1]
+
+        error = None
+        try:
+            if job.action == ImageJob.UPLOAD:
+                run_upload(job)
+            else:
+                run_deletes(jobs)
+        except Exception as job_error:
+            error = job_error
+            for failed_job in jobs:
+                retry_or_fail(failed_job, error)
+        else:
+            ImageJob.objects.filter(pk__in=[finished_job.pk for finished_job in jobs]).delete()
+
+        if job.action == ImageJob.UPLOAD and (error is None or job.status == ImageJob.FAILED):
+            # images (or their status) shown for the book changed.
+            Book.objects.filter(pk=job.book_id).touch()
+            bump_catalogue_version()
+
+    return jobs, error
+
+
+def retry_failed_jobs():
+    """
+       Move 'failed' jobs back to the queue with fresh attempts.
+
+       Returns: number of jobs moved.
+    """
+
+    return ImageJob.objects.filter(status=ImageJob.FAILED).update(
+        status=ImageJob.PENDING, attempts=0, run_after=timezone.now()
+    )
@@ -0,0 +1,129 @@
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from users.reference_data import get_reference_data
+from books.models import Book
+from books.serializers import BookImportSerializer
+from api_config.utils.cache_utils import bump_catalogue_version
+
+# Through table of book 'categories'
+BookCategory = Book.categories.through
+
+# Formats accepted by the bulk import (CSV with a header line, or one JSON object per line)
+IMPORT_FORMATS = ["csv", "jsonl"]
+
+# Separator of the categories in a single CSV cell (Ex: 'Fiction|Fantasy')
+CATEGORY_SEPARATOR = "|"
+
+
+def read_csv(lines):
+    """
+       Rows of a CSV stream (first line is the header), empty cells are left out.
+    """
+
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, {key: value for key, value in row.items() if key and value not in ("", None)}
+
+
+def read_jsonl(lines):
+    """
+       Rows of a JSON Lines stream (blank lines are skipped), a row is None if its line is not a JSON object.
+    """
+
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_num, row if isinstance(row, dict) else None
+
+
+def read_rows(lines, import_format):
+    """
+       Parse a stream of text 'lines' lazily.
+
+       Returns: iterator of '(line number, row)' --> row is a dict, or None if it couldn't be read.
+    """
+
+    if import_format == "csv":
+        return read_csv(lines)
+    return read_jsonl(lines)
+
+
+def get_categories(row, tag_ids):
+    """
+       Ids of the known categories (tag texts) of a row, unknown categories are ignored like in 'POST /api/books/'.
+    """
+
+    categories = row.get("categories", [])
+    if isinstance(categories, str):
+        categories = categories.split(CATEGORY_SEPARATOR)
+
+    texts = dict.fromkeys(str(category).strip() for category in categories)
+    return [tag_ids[text] for text in texts if text in tag_ids]
+
+
+def import_books(rows, user, batch_size=None):
+    """
+       Create books of 'user' from parsed 'rows' (see 'read_rows'), 'batch_size' rows at a time.
+
+       Each batch is validated row by row with 'BookImportSerializer', invalid rows are reported and skipped,
+       valid rows are inserted with a single 'bulk_create' and their categories with another one.
+
+       Returns: {"created": number of books created, "errors": [{"line": ..., "errors": {...}}]}
+    """
+
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+
+    # tags (text --> id) are looked up once for the whole import.
+    tag_ids = get_reference_data()["tag_ids"]
+
+    # fields are built once and reused for every row.
+    serializer = BookImportSerializer()
+
+    created = 0
+    errors = []
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        books = []
+        book_categories = []
+        for line_num, row in batch:
+            if row is None:
+                errors.append({"line": line_num, "errors": {"non_field_errors": ["Invalid row."]}})
+                continue
+
+            try:
+                validated_data = serializer.run_validation(row)
+            except ValidationError as error:
+                errors.append({"line": line_num, "errors": error.detail})
+                continue
+
+            books.append(Book(user_id=user.id, **validated_data))
+            book_categories.append(get_categories(row, tag_ids))
+
+        # a batch is saved completely or not at all.
+        with transaction.atomic():
+            Book.objects.bulk_create(books)
+            BookCategory.objects.bulk_create(
+                [
+                    BookCategory(book_id=book.id, tag_id=tag_id)
+                    for book, tag_ids_of_book in zip(books, book_categories)
+                    for tag_id in tag_ids_of_book
+                ]
+            )
+        created += len(books)
+
+    # new books are shown in the feed.
+    if created:
+        bump_catalogue_version()
+
+    return {"created": created, "errors": errors}
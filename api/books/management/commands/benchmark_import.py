@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.models import Tag
+from users.reference_data import bump_reference_data_version
+from books.importer import IMPORT_FORMATS, import_books, read_rows
+from api_config.utils.benchmark_utils import create_benchmark_user, rolled_back
+from api_config.utils.cache_utils import bump_catalogue_version
+
+# Categories of the generated books
+BENCHMARK_TAGS = ["benchmark-fiction", "benchmark-science", "benchmark-history"]
+
+
+def generate_rows(count, invalid_every):
+    # rows of books with two categories each, every 'invalid_every'-th row has no title.
+    for i in range(count):
+        row = {
+            "title": f"Imported book {i}",
+            "description": "Description of the imported book",
+            "author": f"Author {i % 500}",
+            "for_sale": "true" if i % 2 else "false",
+            "price": str(100 + i % 400),
+            "address": "Address",
+            "city": "Pune",
+            "state": "Maharashtra",
+            "country": "India",
+            "categories": [BENCHMARK_TAGS[i % 3], BENCHMARK_TAGS[(i + 1) % 3]],
+        }
+        if invalid_every and i % invalid_every == invalid_every - 1:
+            del row["title"]
+        yield row
+
+
+def write_file(rows, import_format):
+    file = io.StringIO()
+    if import_format == "csv":
+        writer = None
+        for row in rows:
+            row = {**row, "categories": "|".join(row["categories"])}
+            if writer is None:
+                writer = csv.DictWriter(file, fieldnames=["title", *[key for key in row if key != "title"]])
+                writer.writeheader()
+            writer.writerow(row)
+    else:
+        for row in rows:
+            file.write(json.dumps(row) + "\n")
+
+    file.seek(0)
+    return file
+
+
+class Command(BaseCommand):
+    help = "Measure throughput (books/s) of the bulk import for each format (the data is rolled back)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=20000, help="Number of rows of each file.")
+        parser.add_argument(
+            "--batch-sizes", type=int, nargs="+", default=[500, 2000], help="Numbers of rows inserted at once."
+        )
+        parser.add_argument(
+            "--invalid-every", type=int, default=100, help="Every n-th row is invalid (0: all rows are valid)."
+        )
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            user = create_benchmark_user("benchmark-import@example.com")
+            for text in BENCHMARK_TAGS:
+                Tag.objects.get_or_create(text=text)
+            bump_reference_data_version()
+
+            for import_format in IMPORT_FORMATS:
+                for batch_size in options["batch_sizes"]:
+                    file = write_file(generate_rows(options["books"], options["invalid_every"]), import_format)
+
+                    started = time.perf_counter()
+                    result = import_books(read_rows(file, import_format), user, batch_size)
+                    seconds = time.perf_counter() - started
+
+                    self.stdout.write(
+                        f"{import_format}, batches of {batch_size}: {result['created']} books "
+                        f"({len(result['errors'])} rows skipped) in {seconds:.2f}s, "
+                        f"{result['created'] / seconds:.0f} books/s"
+                    )
+
+        # tags and books of the benchmark are gone.
+        bump_reference_data_version()
+        bump_catalogue_version()
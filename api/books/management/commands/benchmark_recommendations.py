@@ -0,0 +1,137 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIClient
+
+from users.models import Tag, User
+from books.models import Book
+from books.recommendations import (
+    BookCategory,
+    UserInterest,
+    compute_tag_weights,
+    rebuild_recommendations,
+    refresh_book_recommendations,
+    refresh_user_recommendations,
+)
+from api_config.utils.benchmark_utils import create_benchmark_user, percentile, rolled_back
+
+# Rows inserted by each bulk insert
+BATCH_SIZE = 10000
+
+
+def timed(function, *args):
+    # milliseconds taken by 'function(*args)'.
+    started = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - started) * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure latency of the recommendations (endpoint, refreshes of a user and of a book, full rebuild) "
+        "over generated books, users and tags (the data is rolled back)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=100000, help="Number of books.")
+        parser.add_argument("--users", type=int, default=50000, help="Number of users.")
+        parser.add_argument("--tags", type=int, default=50, help="Number of tags.")
+        parser.add_argument("--samples", type=int, default=50, help="Number of measured requests and refreshes.")
+        parser.add_argument("--skip-rebuild", action="store_true", help="Don't measure the full rebuild.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the generated data.")
+
+    def report(self, name, latencies):
+        self.stdout.write(
+            f"{name}: p50 {percentile(latencies, 50):.1f} ms, p95 {percentile(latencies, 95):.1f} ms, "
+            f"max {max(latencies):.1f} ms"
+        )
+
+    def handle(self, *args, **options):
+        random.seed(options["seed"])
+
+        with rolled_back():
+            owner = create_benchmark_user("benchmark-recommendations@example.com")
+            tag_ids = [
+                tag.id
+                for tag in Tag.objects.bulk_create(
+                    [Tag(text=f"benchmark-tag-{i}") for i in range(options["tags"])]
+                )
+            ]
+
+            started = time.perf_counter()
+            book_ids = []
+            for start in range(0, options["books"], BATCH_SIZE):
+                books = Book.objects.bulk_create(
+                    [
+                        Book(
+                            user=owner,
+                            title=f"Book {i}",
+                            description="Description of the book",
+                            address="Address",
+                            city="Pune",
+                            state="Maharashtra",
+                            country="India",
+                        )
+                        for i in range(start, min(start + BATCH_SIZE, options["books"]))
+                    ]
+                )
+                BookCategory.objects.bulk_create(
+                    [
+                        BookCategory(book_id=book.id, tag_id=tag_id)
+                        for book in books
+                        for tag_id in random.sample(tag_ids, random.randint(1, 3))
+                    ]
+                )
+                book_ids += [book.id for book in books]
+
+            user_ids = []
+            for start in range(0, options["users"], BATCH_SIZE):
+                users = User.objects.bulk_create(
+                    [
+                        User(
+                            first_name="Reader",
+                            last_name=str(i),
+                            email=f"benchmark-reader-{i}@example.com",
+                            gender=owner.gender,
+                            password="!",
+                        )
+                        for i in range(start, min(start + BATCH_SIZE, options["users"]))
+                    ]
+                )
+                UserInterest.objects.bulk_create(
+                    [
+                        UserInterest(user_id=user.id, tag_id=tag_id)
+                        for user in users
+                        for tag_id in random.sample(tag_ids, random.randint(1, 5))
+                    ]
+                )
+                user_ids += [user.id for user in users]
+
+            self.stdout.write(
+                f"{options['books']} books, {options['users']} users, {options['tags']} tags "
+                f"generated in {time.perf_counter() - started:.1f}s"
+            )
+
+            self.stdout.write(f"tag weights: {timed(compute_tag_weights):.1f} ms")
+
+            if not options["skip_rebuild"]:
+                started = time.perf_counter()
+                saved = rebuild_recommendations()
+                self.stdout.write(f"full rebuild: {saved} recommendations in {time.perf_counter() - started:.1f}s")
+
+            sample_users = random.sample(user_ids, min(options["samples"], len(user_ids)))
+            self.report(
+                "refresh of a user", [timed(refresh_user_recommendations, user_id) for user_id in sample_users]
+            )
+
+            sample_books = Book.objects.filter(id__in=random.sample(book_ids, min(options["samples"], len(book_ids))))
+            self.report("refresh of a book", [timed(refresh_book_recommendations, book) for book in sample_books])
+
+            # the home page request, once the recommendations are saved.
+            latencies = []
+            for user in User.objects.filter(id__in=sample_users):
+                client = APIClient()
+                client.force_authenticate(user)
+                latencies.append(timed(client.get, "/api/books/recommended/"))
+            self.report("GET /api/books/recommended/", latencies)
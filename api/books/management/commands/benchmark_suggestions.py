@@ -0,0 +1,86 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from books.models import Book
+from books.suggestions import suggest
+from api_config.utils.benchmark_utils import create_benchmark_user, percentile, rolled_back
+from api_config.utils.cache_utils import bump_catalogue_version
+
+# Words the generated titles and authors are made of
+TITLE_WORDS = [
+    "shadow", "river", "garden", "empire", "silent", "winter", "journey", "secret", "ocean", "forest",
+    "kingdom", "memory", "stranger", "midnight", "golden", "broken", "history", "science", "island", "letters",
+]
+AUTHOR_NAMES = [
+    "anita", "rahul", "maria", "james", "priya", "george", "emily", "arjun", "sofia", "daniel",
+    "sharma", "smith", "patel", "garcia", "brown", "iyer", "wilson", "khan", "martin", "das",
+]
+
+
+def add_typo(text):
+    # one character replaced by its neighbour in the alphabet.
+    i = random.randrange(len(text))
+    return text[:i] + chr((ord(text[i]) - ord("a") + 1) % 26 + ord("a")) + text[i + 1 :]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure latency of the book suggestions (exact prefixes and prefixes with a typo) "
+        "over a generated catalogue (the data is rolled back)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=100000, help="Number of books in the catalogue.")
+        parser.add_argument("--queries", type=int, default=500, help="Number of prefixes of each kind.")
+        parser.add_argument("--limit", type=int, default=10, help="Number of suggestions per query.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the generated titles and queries.")
+
+    def handle(self, *args, **options):
+        random.seed(options["seed"])
+
+        with rolled_back():
+            user = create_benchmark_user("benchmark-suggestions@example.com")
+
+            titles = []
+            for start in range(0, options["books"], 10000):
+                books = [
+                    Book(
+                        user=user,
+                        title=" ".join(random.sample(TITLE_WORDS, 3)) + f" {i}",
+                        author=" ".join(random.sample(AUTHOR_NAMES, 2)),
+                        description="Description of the book",
+                        address="Address",
+                        city="Pune",
+                        state="Maharashtra",
+                        country="India",
+                    )
+                    for i in range(start, min(start + 10000, options["books"]))
+                ]
+                Book.objects.bulk_create(books)
+                titles += [book.title for book in books]
+
+            # the in-process index (SQLite) is rebuilt for the new catalogue, by the first query.
+            bump_catalogue_version()
+            started = time.perf_counter()
+            suggest("warm", options["limit"])
+            self.stdout.write(
+                f"{options['books']} books ({connection.vendor}), first query: {time.perf_counter() - started:.3f}s"
+            )
+
+            prefixes = [random.choice(titles)[: random.randint(2, 6)] for _ in range(options["queries"])]
+            for kind, queries in [("exact", prefixes), ("typo", [add_typo(prefix) for prefix in prefixes])]:
+                latencies = []
+                for prefix in queries:
+                    started = time.perf_counter()
+                    suggest(prefix, options["limit"])
+                    latencies.append((time.perf_counter() - started) * 1000)
+
+                self.stdout.write(
+                    f"{kind} prefixes: p50 {percentile(latencies, 50):.2f} ms, "
+                    f"p95 {percentile(latencies, 95):.2f} ms, max {max(latencies):.2f} ms"
+                )
+
+            bump_catalogue_version()
@@ -0,0 +1,114 @@
+import io
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from PIL import Image as PILImage
+
+from api_config.utils.cloudinary_utils import encode_image_variants, get_variant_ids
+from api_config.utils.storage import MediaStorage
+
+
+class LatencyStorage(MediaStorage):
+    """
+      Fake storage that keeps nothing and takes 'latency' seconds per call, like a round-trip to the image host.
+    """
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def upload(self, file, public_id):
+        file.read()
+        time.sleep(self.latency)
+        return f"https://images.example.com/{public_id}"
+
+    def delete_many(self, public_ids):
+        time.sleep(self.latency)
+
+
+def create_image(size):
+    # uploaded image (JPEG, like a phone photo) with enough detail to take a realistic time to encode.
+    image = PILImage.merge(
+        "RGB",
+        [
+            PILImage.effect_mandelbrot(size, (-2, -1.2, 1, 1.2), 100),
+            PILImage.effect_noise(size, 10),
+            PILImage.linear_gradient("L").resize(size),
+        ],
+    )
+    encoded = io.BytesIO()
+    image.save(encoded, format="JPEG", quality=95)
+    encoded.seek(0)
+    return encoded
+
+
+def get_size(file):
+    return len(file.getbuffer())
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the bytes saved by the image variants, and the time to upload the images of a book "
+        "(with their variants) one after another and concurrently, with a fake storage adding latency to each upload."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--images", type=int, default=4, help="Number of images of the book.")
+        parser.add_argument("--latency", type=float, default=0.2, help="Seconds taken by each upload.")
+        parser.add_argument(
+            "--image-size", type=int, nargs=2, default=[4000, 3000], help="Width and height of the generated images."
+        )
+        parser.add_argument(
+            "--files", nargs="+", help="Images to upload instead of generated ones (Ex: photos from a phone)."
+        )
+
+    def handle(self, *args, **options):
+        storage = LatencyStorage(options["latency"])
+
+        if options["files"]:
+            images = []
+            for path in options["files"]:
+                with open(path, "rb") as file:
+                    images.append(io.BytesIO(file.read()))
+        else:
+            images = [create_image(tuple(options["image_size"])) for _ in range(options["images"])]
+
+        started = time.perf_counter()
+        files = []
+        sizes = {"original": 0, "full": 0, "medium": 0, "thumbnail": 0}
+        for i, image in enumerate(images):
+            sizes["original"] += get_size(image)
+            variants = encode_image_variants(image)
+            for name, variant in variants.items():
+                sizes[name] += get_size(variant)
+
+            files += zip(
+                [variants["full"], variants["thumbnail"], variants["medium"]], get_variant_ids(f"benchmark/{i}")
+            )
+        self.stdout.write(
+            f"{len(images)} images encoded ({len(files)} files): {time.perf_counter() - started:.2f}s"
+        )
+
+        # bytes sent to storage (all the variants) and downloaded by the feed (thumbnails), against the originals.
+        uploaded = sizes["full"] + sizes["medium"] + sizes["thumbnail"]
+        self.stdout.write(f"originals: {sizes['original']} bytes (variants encoded as {settings.IMAGE_FORMAT})")
+        for name, size in [*[(name, sizes[name]) for name in ["full", "medium", "thumbnail"]], ("uploaded", uploaded)]:
+            self.stdout.write(f"{name}: {size} bytes, {100 * (1 - size / sizes['original']):.2f}% saved")
+
+        for file, _ in files:
+            file.seek(0)
+        started = time.perf_counter()
+        for file, public_id in files:
+            storage.upload(file, public_id)
+        sequential = time.perf_counter() - started
+        self.stdout.write(f"uploaded one after another: {sequential:.2f}s")
+
+        for file, _ in files:
+            file.seek(0)
+        started = time.perf_counter()
+        storage.upload_many(files)
+        concurrent = time.perf_counter() - started
+        self.stdout.write(
+            f"uploaded concurrently ({settings.IMAGE_UPLOAD_WORKERS} workers): {concurrent:.2f}s, "
+            f"{sequential / concurrent:.1f}x faster"
+        )
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from books.recommendations import rebuild_recommendations
+
+
+class Command(BaseCommand):
+    help = "Recompute book recommendations of all the users (tag overlap of interests and categories)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Number of users scored at once."
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        saved = rebuild_recommendations(users_per_batch=options["batch_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Saved {saved} recommendations in {time.perf_counter() - start:.2f}s."
+            )
+        )
@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from books.importer import IMPORT_FORMATS, import_books, read_rows
+
+
+class Command(BaseCommand):
+    help = "Import books in bulk from a CSV (with a header line) or JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import ('-' reads standard input).")
+        parser.add_argument("--user", required=True, help="Email of the user who owns the imported books.")
+        parser.add_argument(
+            "--format", choices=IMPORT_FORMATS, help="Format of the file (default: from the file extension)."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE, help="Number of rows inserted at once."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get_by_email(options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist.")
+
+        import_format = options["format"] or os.path.splitext(options["path"])[1].lstrip(".").lower()
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError("Pass --format, the format can't be known from the file extension.")
+
+        if options["path"] == "-":
+            file = open(sys.stdin.fileno(), encoding="utf-8-sig", newline="", closefd=False)
+        else:
+            file = open(options["path"], encoding="utf-8-sig", newline="")
+
+        start = time.perf_counter()
+        with file:
+            result = import_books(read_rows(file, import_format), user, options["batch_size"])
+        elapsed = time.perf_counter() - start
+
+        for error in result["errors"]:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result['created']} books ({len(result['errors'])} rows skipped) in {elapsed:.2f}s "
+                f"({result['created'] / max(elapsed, 0.001):.0f} books/s)."
+            )
+        )
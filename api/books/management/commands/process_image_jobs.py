@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from books.image_jobs import process_next_job, retry_failed_jobs
+from books.models import ImageJob
+
+
+class Command(BaseCommand):
+    help = "Run queued image jobs (uploads of book images and deletions from cloud)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Exit when no job is ready instead of waiting for new jobs."
+        )
+        parser.add_argument(
+            "--sleep", type=float, default=2, help="Seconds to wait before polling again when no job is ready."
+        )
+        parser.add_argument(
+            "--retry-failed", action="store_true", help="Queue the failed jobs again before running."
+        )
+
+    def handle(self, *args, **options):
+        if options["retry_failed"]:
+            self.stdout.write(f"Queued {retry_failed_jobs()} failed jobs again.")
+
+        while True:
+            jobs, error = process_next_job()
+
+            if not jobs:
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+            elif error is not None:
+                for job in jobs:
+                    state = "failed" if job.status == ImageJob.FAILED else "will be retried"
+                    self.stderr.write(f"Job {job.id} ({job.action}) {state}: {job.last_error}")
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from books.recommendations import process_next_recommendation_job
+
+
+class Command(BaseCommand):
+    help = "Run queued refreshes of recommendations (after interests of a user or categories of a book change)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Exit when the queue is empty instead of waiting for new jobs."
+        )
+        parser.add_argument(
+            "--sleep", type=float, default=2, help="Seconds to wait before polling again when the queue is empty."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            job, error = process_next_recommendation_job()
+
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+            elif error is not None:
+                target = f"user {job.user_id}" if job.user_id is not None else f"book {job.book_id}"
+                self.stderr.write(f"Couldn't refresh recommendations of {target}: {error}")
@@ -0,0 +1,19 @@
+# Generated by Django 4.1 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["-created_on", "-id"], name="books_created_on_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.1 on 2026-10-18 12:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Keep 'search_vector' in sync with title, author and description on every write.
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION books_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.author, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER books_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, author, description ON books
+    FOR EACH ROW EXECUTE FUNCTION books_search_vector_update();
+
+UPDATE books SET search_vector =
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(author, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'C');
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS books_search_vector_trigger ON books;
+DROP FUNCTION IF EXISTS books_search_vector_update();
+"""
+
+
+def create_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_TRIGGER)
+
+
+def drop_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0003_books_created_on_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="books_search_vector_idx"
+            ),
+        ),
+        migrations.RunPython(create_trigger, drop_trigger),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.1 on 2026-10-18 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0004_book_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["city", "-created_on", "-id"], name="books_city_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["state", "-created_on", "-id"], name="books_state_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["country", "-created_on", "-id"],
+                name="books_country_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["for_sale", "-created_on", "-id"],
+                name="books_for_sale_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(fields=["price"], name="books_price_idx"),
+        ),
+        # category filter looks up books by tag, the default index is on (book_id, tag_id).
+        migrations.RunSQL(
+            "CREATE INDEX books_categories_tag_book_idx ON books_categories (tag_id, book_id);",
+            "DROP INDEX books_categories_tag_book_idx;",
+        ),
+    ]
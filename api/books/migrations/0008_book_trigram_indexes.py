@@ -0,0 +1,57 @@
+# Generated by Django 4.1 on 2026-10-18 12:07
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+import django.db.models.functions.text
+
+TRIGRAM_INDEXES = [
+    django.contrib.postgres.indexes.GinIndex(
+        django.contrib.postgres.indexes.OpClass(
+            django.db.models.functions.text.Upper("title"), name="gin_trgm_ops"
+        ),
+        name="books_title_trgm_idx",
+    ),
+    django.contrib.postgres.indexes.GinIndex(
+        django.contrib.postgres.indexes.OpClass(
+            django.db.models.functions.text.Upper("author"), name="gin_trgm_ops"
+        ),
+        name="books_author_trgm_idx",
+    ),
+]
+
+
+# Trigram indexes only exist on PostgreSQL, other databases (Ex: SQLite) use the in-process prefix index.
+def add_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        Book = apps.get_model("books", "Book")
+        for index in TRIGRAM_INDEXES:
+            schema_editor.add_index(Book, index)
+
+
+def remove_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        Book = apps.get_model("books", "Book")
+        for index in TRIGRAM_INDEXES:
+            schema_editor.remove_index(Book, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0007_recommendation"),
+    ]
+
+    operations = [
+        # 'pg_trgm' is only installed on PostgreSQL, skipped on other databases.
+        TrigramExtension(),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(add_trigram_indexes, remove_trigram_indexes),
+            ],
+            state_operations=[
+                migrations.AddIndex(model_name="book", index=index)
+                for index in TRIGRAM_INDEXES
+            ],
+        ),
+    ]
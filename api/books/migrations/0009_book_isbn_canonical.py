@@ -0,0 +1,55 @@
+# Generated by Django 4.1 on 2026-10-18 12:08
+
+from django.db import migrations, models
+
+from api_config.utils.isbn_utils import normalize_isbn
+
+BATCH_SIZE = 1000
+
+
+def normalize_existing_isbns(apps, schema_editor):
+    """
+    Save the canonical ISBN of existing books, in batches (keyset on 'id') to bound memory and locks.
+    """
+
+    Book = apps.get_model("books", "Book")
+    last_id = 0
+
+    while True:
+        books = list(
+            Book.objects.filter(id__gt=last_id, isbn__isnull=False)
+            .order_by("id")
+            .only("id", "isbn")[:BATCH_SIZE]
+        )
+        if not books:
+            break
+
+        for book in books:
+            book.isbn_canonical = normalize_isbn(book.isbn)
+        Book.objects.bulk_update(books, ["isbn_canonical"], batch_size=BATCH_SIZE)
+
+        last_id = books[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0008_book_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="isbn_canonical",
+            field=models.CharField(editable=False, max_length=13, null=True),
+        ),
+        # backfill before the index is built.
+        migrations.RunPython(normalize_existing_isbns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["isbn_canonical", "-created_on", "-id"],
+                name="books_isbn_created_idx",
+            ),
+        ),
+    ]
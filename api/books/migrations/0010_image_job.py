@@ -0,0 +1,61 @@
+# Generated by Django 4.1 on 2026-10-18 12:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0009_book_isbn_canonical"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImageJob",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[("upload", "Upload"), ("delete", "Delete")],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("pending", "Pending"), ("failed", "Failed")],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("content", models.BinaryField(null=True)),
+                ("folder_name", models.TextField(default="")),
+                ("filename", models.TextField(default="")),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("run_after", models.DateTimeField(default=django.utils.timezone.now)),
+                ("last_error", models.TextField(default="")),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+                (
+                    "book",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="image_jobs",
+                        to="books.book",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "image_jobs",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="imagejob",
+            index=models.Index(
+                fields=["status", "run_after", "id"], name="image_jobs_ready_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0010_image_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="image",
+            name="medium_url",
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name="image",
+            name="thumbnail_url",
+            field=models.TextField(null=True),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.1 on 2026-10-18 12:23
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def delete_duplicate_wishlist_entries(apps, schema_editor):
+    """
+    Keep the oldest entry of every (user, book) pair.
+    """
+
+    WishList = apps.get_model("books", "WishList")
+    oldest = (
+        WishList.objects.values("user_id", "book_id")
+        .annotate(oldest_id=Min("id"))
+        .values("oldest_id")
+    )
+    WishList.objects.exclude(id__in=oldest).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0011_image_variants"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            delete_duplicate_wishlist_entries, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="wishlist",
+            constraint=models.UniqueConstraint(
+                fields=("user", "book"), name="unique_user_book_wishlist"
+            ),
+        ),
+    ]
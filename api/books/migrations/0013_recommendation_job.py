@@ -0,0 +1,56 @@
+# Generated by Django 4.1 on 2026-10-18 12:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("books", "0012_wishlist_unique"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecommendationJob",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+                (
+                    "book",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recommendation_jobs",
+                        to="books.book",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recommendation_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "recommendation_jobs",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="recommendationjob",
+            constraint=models.UniqueConstraint(
+                fields=("user",), name="unique_recommendation_job_user"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="recommendationjob",
+            constraint=models.UniqueConstraint(
+                fields=("book",), name="unique_recommendation_job_book"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.1 on 2026-10-18 13:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0013_recommendation_job"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["-last_modified"], name="books_last_modified_idx"
+            ),
+        ),
+    ]
@@ -1,6 +1,158 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
 from django.db import models
+from django.db.models import CharField, Count, Exists, F, FloatField, Max, OuterRef, Prefetch, Value
+from django.db.models.functions import Cast, Upper
+from django.utils import timezone
+
+from users.models import User, Tag, UserImage
+
+
+class BookQuerySet(models.QuerySet):
+    """
+    Queries used to list 'books'.
+    """
+
+    def for_feed(self):
+        """
+        Load only what 'BookSerializer' renders: book columns, uploader (joined) and images of both.
+
+        The number of queries is constant (books + book images + user images) for any number of books.
+        """
+
+        return (
+            self.select_related("user")
+            .only(
+                "id",
+                "title",
+                "description",
+                "for_sale",
+                "price",
+                "author",
+                "created_on",
+                "user__id",
+                "user__first_name",
+                "user__last_name",
+            )
+            .prefetch_related(
+                Prefetch(
+                    "images",
+                    queryset=Image.objects.only(
+                        "id", "book_id", "url", "filename", "thumbnail_url", "medium_url"
+                    ),
+                ),
+                Prefetch("user__images", queryset=UserImage.objects.all()),
+            )
+        )
+
+    def for_profile(self):
+        """
+        Load only what the profile 'BookSerializer' (users app) renders: book columns, images and categories.
+
+        The number of queries is constant (books + images + categories) for any number of books.
+        """
+
+        return self.only(
+            "id", "user_id", "title", "description", "for_sale", "price", "author", "created_on"
+        ).prefetch_related(
+            Prefetch("images", queryset=Image.objects.only("id", "book_id", "url", "filename")),
+            Prefetch("categories", queryset=Tag.objects.all()),
+        )
+
+    def search(self, text):
+        """
+        Full-text search over title, author and description, annotated with relevance 'rank'.
+        """
+
+        query = SearchQuery(text, search_type="websearch", config="english")
+
+        # 'ts_rank' returns 'real', cast it so the rank can be used in a pagination cursor.
+        rank = Cast(SearchRank(F("search_vector"), query), output_field=FloatField())
+        return self.filter(search_vector=query).annotate(rank=rank)
+
+    def for_detail(self, user_id):
+        """
+        Load everything 'BookDetailSerializer' renders with a constant number of queries,
+        annotated with 'comment_count', 'in_wishlist' of the user (comments are paginated separately)
+        and 'images_pending' / 'images_failed' (uploads still queued or out of attempts).
+        """
+
+        in_wishlist = WishList.objects.filter(book_id=OuterRef("pk"), user_id=user_id)
+        uploads = ImageJob.objects.filter(book_id=OuterRef("pk"), action=ImageJob.UPLOAD)
+
+        return (
+            self.select_related("user")
+            .prefetch_related("categories", "images", "user__images")
+            .annotate(
+                comment_count=Count("comments"),
+                in_wishlist=Exists(in_wishlist),
+                images_pending=Exists(uploads.filter(status=ImageJob.PENDING)),
+                images_failed=Exists(uploads.filter(status=ImageJob.FAILED)),
+            )
+        )
+
+    def validators(self, user_id):
+        """
+        Values that change whenever the detail of a book changes for the user, used to build its 'ETag'.
+        """
+
+        in_wishlist = WishList.objects.filter(book_id=OuterRef("pk"), user_id=user_id)
+        return self.annotate(
+            comment_count=Count("comments"),
+            comments_modified=Max("comments__last_modified"),
+            in_wishlist=Exists(in_wishlist),
+        ).values("id", "last_modified", "comment_count", "comments_modified", "in_wishlist")
+
+    def with_categories(self, categories):
+        """
+        Books having any of the 'categories' (tag texts).
+        """
+
+        # 'EXISTS' instead of a join, so books with many matching categories aren't duplicated.
+        book_categories = self.model.categories.through.objects.filter(
+            book_id=OuterRef("pk"), tag__text__in=categories
+        )
+        return self.filter(Exists(book_categories))
+
+    def catalogue_state(self):
+        """
+        Latest change and number of the books, changed by any process (Ex: the image worker or an import).
+        """
+
+        state = self.aggregate(last_modified=Max("last_modified"), count=Count("id"))
+        return state["last_modified"], state["count"]
+
+    def touch(self):
+        """
+        Mark the books as changed (Ex: their images or their uploader changed), see 'catalogue_state'.
+        """
+
+        return self.update(last_modified=timezone.now())
+
+    def facet_counts(self):
+        """
+        Number of books per category and per city.
+
+        Both 'GROUP BY' are combined with 'UNION ALL', so all facets are counted in a single query.
+        """
+
+        category_counts = (
+            self.model.categories.through.objects.filter(book_id__in=self.values("id"))
+            .values(value=F("tag__text"))
+            .annotate(facet=Value("categories", output_field=CharField()), count=Count("id"))
+            .order_by()
+        )
+        city_counts = (
+            self.values(value=F("city"))
+            .annotate(facet=Value("cities", output_field=CharField()), count=Count("id"))
+            .order_by()
+        )
+
+        facets = {"categories": {}, "cities": {}}
+        for row in category_counts.union(city_counts, all=True):
+            facets[row["facet"]][row["value"]] = row["count"]
+        return facets
 
-from users.models import User, Tag
 
 class Book(models.Model):
     """
@@ -15,6 +167,7 @@ class Book(models.Model):
     author = models.CharField(max_length=30, null=True)
     description = models.TextField()
     isbn = models.TextField(null=True)
+    isbn_canonical = models.CharField(max_length=13, null=True, editable=False)  # ISBN-13 (digits only)
     publisher = models.CharField(max_length=30, null=True)
     categories = models.ManyToManyField(Tag, related_name="categories")
 
@@ -31,8 +184,13 @@ class Book(models.Model):
     country = models.CharField(max_length=40)
 
     # timestamps
-    created_on = models.DateField(auto_now_add=True)
-    last_modified = models.DateField(auto_now=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+    last_modified = models.DateTimeField(auto_now=True)
+
+    # weighted 'tsvector' of title, author and description (maintained by a DB trigger).
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = BookQuerySet.as_manager()
 
     class Meta:
         db_table = "books"
@@ -50,6 +208,25 @@ class Book(models.Model):
                 check=~models.Q(country=""), name="non_empty_country"
             ),
         ]
+        indexes = [
+            # keyset used to paginate the feed (newest first).
+            models.Index(fields=["-created_on", "-id"], name="books_created_on_id_idx"),
+            # full-text search of the feed.
+            GinIndex(fields=["search_vector"], name="books_search_vector_idx"),
+            # feed filters, each paired with the pagination keyset.
+            models.Index(fields=["city", "-created_on", "-id"], name="books_city_created_idx"),
+            models.Index(fields=["state", "-created_on", "-id"], name="books_state_created_idx"),
+            models.Index(fields=["country", "-created_on", "-id"], name="books_country_created_idx"),
+            models.Index(fields=["for_sale", "-created_on", "-id"], name="books_for_sale_created_idx"),
+            models.Index(fields=["price"], name="books_price_idx"),
+            # latest change of the catalogue ('catalogue_state').
+            models.Index(fields=["-last_modified"], name="books_last_modified_idx"),
+            # listings of the same edition.
+            models.Index(fields=["isbn_canonical", "-created_on", "-id"], name="books_isbn_created_idx"),
+            # typo tolerant autocomplete of titles and authors ('pg_trgm', serves 'LIKE' and '%>').
+            GinIndex(OpClass(Upper("title"), name="gin_trgm_ops"), name="books_title_trgm_idx"),
+            GinIndex(OpClass(Upper("author"), name="gin_trgm_ops"), name="books_author_trgm_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.title
@@ -65,6 +242,10 @@ class Image(models.Model):
     url = models.TextField(default=None)
     filename = models.TextField(default=None)
 
+    # smaller variants of the image (null for images uploaded before variants existed).
+    thumbnail_url = models.TextField(null=True)
+    medium_url = models.TextField(null=True)
+
     class Meta:
         db_table = "book_images"
         constraints = [
@@ -75,6 +256,106 @@ class Image(models.Model):
         ]
 
 
+class ImageJob(models.Model):
+    """
+        Cloud image work (upload of a book image or deletion of any image) done by the
+        'process_image_jobs' worker, outside of the request.
+    """
+
+    UPLOAD = "upload"
+    DELETE = "delete"
+    ACTIONS = [(UPLOAD, "Upload"), (DELETE, "Delete")]
+
+    # finished jobs are deleted, jobs out of attempts are kept as 'failed' (dead-letter).
+    PENDING = "pending"
+    FAILED = "failed"
+    STATUSES = [(PENDING, "Pending"), (FAILED, "Failed")]
+
+    id = models.BigAutoField(primary_key=True)
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+
+    # upload --> book of the image, spooled image bytes and cloud folder.
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="image_jobs", null=True)
+    content = models.BinaryField(null=True)
+    folder_name = models.TextField(default="")
+
+    # delete --> cloud filename (public id) of the image.
+    filename = models.TextField(default="")
+
+    # retries
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(default="")
+
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "image_jobs"
+        indexes = [
+            # jobs ready to run, oldest first.
+            models.Index(fields=["status", "run_after", "id"], name="image_jobs_ready_idx"),
+        ]
+
+
+class WishListQuerySet(models.QuerySet):
+    """
+    Changes to the 'wishlist' of a user, safe to repeat (idempotent).
+    """
+
+    def add_books(self, user_id, book_ids):
+        """
+        Add books to the wishlist of the user with a single 'INSERT ... ON CONFLICT DO NOTHING'.
+
+        Missing books and own books of the user are skipped (books already in the wishlist are kept).
+
+        Returns: ids of the books in the wishlist now.
+        """
+
+        book_ids = list(
+            Book.objects.filter(id__in=book_ids).exclude(user_id=user_id).values_list("id", flat=True)
+        )
+        self.bulk_create(
+            [WishList(user_id=user_id, book_id=book_id) for book_id in book_ids], ignore_conflicts=True
+        )
+        return book_ids
+
+    def for_profile(self):
+        """
+        Load wishlist entries with their book (joined), its images and categories, in a constant number of queries.
+        """
+
+        return (
+            self.select_related("book")
+            .only(
+                "id",
+                "book",
+                "book__id",
+                "book__user_id",
+                "book__title",
+                "book__description",
+                "book__for_sale",
+                "book__price",
+                "book__author",
+            )
+            .prefetch_related(
+                Prefetch(
+                    "book__images", queryset=Image.objects.only("id", "book_id", "url", "filename")
+                ),
+                Prefetch("book__categories", queryset=Tag.objects.all()),
+            )
+        )
+
+    def remove_books(self, user_id, book_ids):
+        """
+        Remove books from the wishlist of the user with a single 'DELETE'.
+
+        Returns: number of books removed.
+        """
+
+        return self.filter(user_id=user_id, book_id__in=book_ids).delete()[0]
+
+
 class WishList(models.Model):
     """
         Wishlist of the user.
@@ -83,5 +364,49 @@ class WishList(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="wishlist")
     book = models.ForeignKey(Book, on_delete=models.CASCADE)
 
+    objects = WishListQuerySet.as_manager()
+
+    class Meta:
+        db_table = "user_wishlist"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "book"], name="unique_user_book_wishlist"),
+        ]
+
+class Recommendation(models.Model):
+    """
+        Precomputed score of a book for a user (weighted overlap of user 'interests' and book 'categories').
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="recommendations")
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+
     class Meta:
-        db_table = "user_wishlist"
\ No newline at end of file
+        db_table = "book_recommendations"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "book"], name="unique_user_book_recommendation"),
+        ]
+        indexes = [
+            models.Index(fields=["user", "-score"], name="recommendations_user_idx"),
+        ]
+
+
+class RecommendationJob(models.Model):
+    """
+        Refresh of the recommendations of a user ('interests' changed) or of a book ('categories' changed),
+        done by the 'process_recommendation_jobs' worker, outside of the request.
+
+        A user or a book has at most one queued job, repeated changes are refreshed once.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="recommendation_jobs", null=True)
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="recommendation_jobs", null=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "recommendation_jobs"
+        constraints = [
+            models.UniqueConstraint(fields=["user"], name="unique_recommendation_job_user"),
+            models.UniqueConstraint(fields=["book"], name="unique_recommendation_job_book"),
+        ]
@@ -0,0 +1,261 @@
+import threading
+
+import numpy as np
+from scipy import sparse
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min
+
+from users.models import Tag, User
+from books.models import Book, Recommendation, RecommendationJob
+
+# Through tables of book 'categories' and user 'interests'
+BookCategory = Book.categories.through
+UserInterest = User.interests.through
+
+
+# Tag weights of the process, recomputed when the books, tags or book categories in the database change.
+_tag_weights = {"version": None, "weights": None}
+_tag_weights_lock = threading.Lock()
+
+
+def get_tag_weights_version():
+    """
+       Numbers of books and book categories and the last tag/category ids, changed by any process
+       (read from the database, not from the per-process cache counters).
+    """
+
+    links = BookCategory.objects.aggregate(count=Count("id"), last_id=Max("id"))
+    return (
+        Book.objects.count(),
+        links["count"],
+        links["last_id"],
+        Tag.objects.aggregate(last_id=Max("id"))["last_id"],
+    )
+
+
+def get_tag_weights():
+    """
+       Weight (IDF) of every tag, indexed by tag id: categories shared by fewer books weigh more.
+
+       Counted over all the book categories only when they changed (see 'get_tag_weights_version').
+    """
+
+    version = get_tag_weights_version()
+
+    with _tag_weights_lock:
+        if _tag_weights["version"] != version:
+            _tag_weights["weights"] = compute_tag_weights()
+            _tag_weights["version"] = version
+
+        return _tag_weights["weights"]
+
+
+def compute_tag_weights():
+
+    number_of_tags = (Tag.objects.aggregate(max_id=Max("id"))["max_id"] or 0) + 1
+    number_of_books = Book.objects.count()
+
+    tag_counts = BookCategory.objects.values("tag_id").annotate(count=Count("book_id"))
+    document_frequency = np.zeros(number_of_tags)
+    for row in tag_counts:
+        document_frequency[row["tag_id"]] = row["count"]
+
+    # smoothed IDF, always > 0 so every shared tag adds to the score.
+    return np.log((1 + number_of_books) / (1 + document_frequency)) + 1
+
+
+def get_matrix(links, number_of_tags):
+    """
+       Sparse (rows x tags) matrix from '(row_id, tag_id)' pairs.
+
+       Returns: (row ids, matrix) --> i-th row of the matrix belongs to i-th row id.
+    """
+
+    links = np.array(list(links), dtype=np.int64).reshape(-1, 2)
+    row_ids, rows = np.unique(links[:, 0], return_inverse=True)
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(links)), (rows, links[:, 1])), shape=(len(row_ids), number_of_tags)
+    )
+    return row_ids, matrix
+
+
+def top_scores(ids, scores, limit):
+    """
+       Get '(id, score)' of the 'limit' highest positive scores, highest first.
+    """
+
+    positive = scores > 0
+    ids, scores = ids[positive], scores[positive]
+
+    if len(scores) > limit:
+        top = np.argpartition(-scores, limit)[:limit]
+        ids, scores = ids[top], scores[top]
+
+    order = np.argsort(-scores, kind="stable")
+    return zip(ids[order].tolist(), scores[order].tolist())
+
+
+def refresh_user_recommendations(user_id):
+    """
+       Recompute recommendations of a user, call it after 'interests' of the user change.
+    """
+
+    weights = get_tag_weights()
+    tag_ids = list(UserInterest.objects.filter(user_id=user_id).values_list("tag_id", flat=True))
+
+    # books sharing at least one tag with the user (except their own books).
+    links = (
+        BookCategory.objects.filter(tag_id__in=tag_ids)
+        .exclude(book__user_id=user_id)
+        .values_list("book_id", "tag_id")
+    )
+    book_ids, books = get_matrix(links, len(weights))
+
+    # score of each book --> sum of weights of the shared tags.
+    scores = books @ weights
+
+    recommendations = [
+        Recommendation(user_id=user_id, book_id=book_id, score=score)
+        for book_id, score in top_scores(book_ids, scores, settings.RECOMMENDATIONS_PER_USER)
+    ]
+
+    with transaction.atomic():
+        Recommendation.objects.filter(user_id=user_id).delete()
+        Recommendation.objects.bulk_create(recommendations, batch_size=1000)
+
+
+def refresh_book_recommendations(book):
+    """
+       Recompute the score of a book for every user, call it after 'categories' of the book change.
+
+       Book is only added for users whose recommendations are not full or have a lower score,
+       recommendations are trimmed back to 'RECOMMENDATIONS_PER_USER' on the next full rebuild.
+    """
+
+    weights = get_tag_weights()
+    tag_ids = list(BookCategory.objects.filter(book_id=book.id).values_list("tag_id", flat=True))
+
+    # users sharing at least one tag with the book (except its owner).
+    links = (
+        UserInterest.objects.filter(tag_id__in=tag_ids)
+        .exclude(user_id=book.user_id)
+        .values_list("user_id", "tag_id")
+    )
+    user_ids, users = get_matrix(links, len(weights))
+    scores = users @ weights
+
+    # lowest score and size of the current recommendations of each user.
+    current = {
+        row["user_id"]: row
+        for row in Recommendation.objects.filter(user_id__in=user_ids.tolist())
+        .exclude(book_id=book.id)
+        .values("user_id")
+        .annotate(lowest=Min("score"), count=Count("id"))
+    }
+
+    recommendations = []
+    for user_id, score in zip(user_ids.tolist(), scores.tolist()):
+        row = current.get(user_id, None)
+        if row is None or row["count"] < settings.RECOMMENDATIONS_PER_USER or score > row["lowest"]:
+            recommendations.append(Recommendation(user_id=user_id, book_id=book.id, score=score))
+
+    with transaction.atomic():
+        Recommendation.objects.filter(book_id=book.id).delete()
+        Recommendation.objects.bulk_create(recommendations, batch_size=1000)
+
+
+def queue_user_recommendations(user_id):
+    """
+       Queue a refresh of the recommendations of a user (nothing is queued if one is already waiting).
+    """
+
+    RecommendationJob.objects.bulk_create([RecommendationJob(user_id=user_id)], ignore_conflicts=True)
+
+
+def queue_book_recommendations(book_id):
+    """
+       Queue a refresh of the score of a book for every user (nothing is queued if one is already waiting).
+    """
+
+    RecommendationJob.objects.bulk_create([RecommendationJob(book_id=book_id)], ignore_conflicts=True)
+
+
+def process_next_recommendation_job():
+    """
+       Run the oldest queued refresh, skipping jobs locked by other workers.
+
+       A job is removed even if the refresh fails (the nightly 'build_recommendations' repairs it),
+       so a broken job can't block the queue.
+
+       Returns: (job run, error) --> job is None if the queue is empty, error is None if the refresh finished.
+    """
+
+    with transaction.atomic():
+        # only the job row is locked (the book is loaded after), 'FOR UPDATE' can't lock the nullable side of a join.
+        job = RecommendationJob.objects.select_for_update(skip_locked=True, of=("self",)).order_by("id").first()
+        if job is None:
+            return None, None
+
+        # removed first, so a change made while the job runs queues a new job (after this one commits).
+        RecommendationJob.objects.filter(pk=job.pk).delete()
+
+        error = None
+        try:
+            with transaction.atomic():
+                if job.user_id is not None:
+                    refresh_user_recommendations(job.user_id)
+                else:
+                    refresh_book_recommendations(job.book)
+        except Exception as job_error:
+            error = job_error
+
+    return job, error
+
+
+def rebuild_recommendations(users_per_batch=1000):
+    """
+       Recompute recommendations of all the users from the full user x tag and book x tag matrices.
+
+       Returns: number of recommendations saved.
+    """
+
+    weights = get_tag_weights()
+
+    book_ids, books = get_matrix(BookCategory.objects.values_list("book_id", "tag_id"), len(weights))
+    user_ids, users = get_matrix(UserInterest.objects.values_list("user_id", "tag_id"), len(weights))
+
+    # owner of each book (column of the score matrix), to skip users' own books.
+    owners = dict(Book.objects.values_list("id", "user_id"))
+    book_owners = np.array([owners[book_id] for book_id in book_ids.tolist()], dtype=np.int64)
+
+    # weighted (tags x books) matrix.
+    weighted_books = books.multiply(weights).T.tocsr()
+
+    saved = 0
+    with transaction.atomic():
+        Recommendation.objects.all().delete()
+
+        for start in range(0, len(user_ids), users_per_batch):
+            # (users x books) scores of the batch.
+            scores = (users[start : start + users_per_batch] @ weighted_books).tocsr()
+
+            recommendations = []
+            for i, user_id in enumerate(user_ids[start : start + users_per_batch].tolist()):
+                # non-zero scores of the user, except their own books.
+                row = scores.getrow(i)
+                not_own_books = book_owners[row.indices] != user_id
+
+                for book_id, score in top_scores(
+                    book_ids[row.indices[not_own_books]],
+                    row.data[not_own_books],
+                    settings.RECOMMENDATIONS_PER_USER,
+                ):
+                    recommendations.append(Recommendation(user_id=user_id, book_id=book_id, score=score))
+
+            Recommendation.objects.bulk_create(recommendations, batch_size=1000)
+            saved += len(recommendations)
+
+    return saved
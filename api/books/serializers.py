@@ -2,7 +2,7 @@ from books.models import Book, Image
 from rest_framework import serializers
 
 from users.serializers import TagSerializer, UserSerializer, UserDetailSerializer
-from comments.serializers import CommentDetailSerializer
+from api_config.utils.isbn_utils import normalize_isbn
 
 
 class ImageSerializer(serializers.ModelSerializer):
@@ -10,12 +10,12 @@ class ImageSerializer(serializers.ModelSerializer):
     Serialize and Deserialize 'Image' of the books.
     """
 
-    # Serialization: fields returned --> id, url, filename
-    # Deserialization: fields retrieved --> book(book_id) , url, filename
+    # Serialization: fields returned --> id, url, filename, thumbnail_url, medium_url
+    # Deserialization: fields retrieved --> book(book_id) , url, filename, thumbnail_url, medium_url
 
     class Meta:
         model = Image
-        fields = ["id", "book", "url", "filename"]
+        fields = ["id", "book", "url", "filename", "thumbnail_url", "medium_url"]
         read_only_fields = ["id"]
         extra_kwargs = {
             "book": {"write_only": True, "required": True},
@@ -28,16 +28,21 @@ class BookDetailSerializer(serializers.ModelSerializer):
     Serialize 'Book' rows with all fields.
     """
 
-    # Serialization: fields returned --> all book_fields, user(details), images, comments(details) and categories
+    # Serialization: fields returned --> all book_fields, user(details), images, comment_count and categories
+    # (first page of comments is added by the view)
 
     user = UserDetailSerializer()
     images = ImageSerializer(many=True, read_only=True)
-    comments = CommentDetailSerializer(many=True, read_only=True)
+    comment_count = serializers.IntegerField(read_only=True)
     categories = TagSerializer(many=True)
 
+    # timestamps are stored with time, but sent as dates.
+    created_on = serializers.DateTimeField(format="%Y-%m-%d", read_only=True)
+    last_modified = serializers.DateTimeField(format="%Y-%m-%d", read_only=True)
+
     class Meta:
         model = Book
-        fields = "__all__"
+        exclude = ["search_vector", "isbn_canonical"]
 
 class BookPostSerializer(serializers.ModelSerializer):
     """
@@ -63,16 +68,47 @@ class BookPostSerializer(serializers.ModelSerializer):
             "country",
         ]
 
+    def validate_isbn(self, value):
+        # ISBN is optional, but if present it should be a valid ISBN-10 or ISBN-13.
+        if value and normalize_isbn(value) is None:
+            raise serializers.ValidationError("Invalid ISBN.")
+        return value or None
+
+    def validate(self, attrs):
+        # save the canonical ISBN-13 to find listings of the same edition.
+        if "isbn" in attrs:
+            attrs["isbn_canonical"] = normalize_isbn(attrs["isbn"])
+        return attrs
+
+class BookImportSerializer(BookPostSerializer):
+    """
+    Deserialize rows of a bulk import (owner of all the books is set by the importer).
+    """
+
+    # Deserialization: fields retrieved --> all 'BookPostSerializer' fields except user
+
+    class Meta(BookPostSerializer.Meta):
+        fields = [field for field in BookPostSerializer.Meta.fields if field != "user"]
+
 class BookSerializer(serializers.ModelSerializer):
     """
     Serialize 'Book' rows with selected fields.
     """
 
-    # Serialization: fields returned --> all book_fields, user(details), book-images
+    # Serialization: fields returned --> all book_fields, user(details), book-images, thumbnail (of the first image)
     images = ImageSerializer(many=True, read_only=True)
+    thumbnail = serializers.SerializerMethodField()
     user = UserDetailSerializer()
+    created_on = serializers.DateTimeField(format="%Y-%m-%d", read_only=True)
 
     class Meta:
         model = Book
-        fields = ["id", "user", "title", "description", "for_sale", "price", "images", "author", "created_on"]
-        read_only_fields = ["id"]
\ No newline at end of file
+        fields = ["id", "user", "title", "description", "for_sale", "price", "images", "thumbnail", "author", "created_on"]
+        read_only_fields = ["id"]
+
+    def get_thumbnail(self, book):
+        # smallest variant of the first image, shown on the cards of list views.
+        images = book.images.all()
+        if not images:
+            return None
+        return images[0].thumbnail_url or images[0].url
\ No newline at end of file
@@ -0,0 +1,140 @@
+import difflib
+import threading
+from bisect import bisect_left
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, F, FloatField, Max, Q, Value, When
+from django.db.models.functions import Upper
+
+from books.models import Book
+from api_config.utils.cache_utils import get_catalogue_version
+
+# Fields of the book suggested while typing
+SUGGESTION_FIELDS = ["title", "author"]
+
+
+def suggest(prefix, limit):
+    """
+       Top 'limit' distinct titles/authors starting with (or similar to) 'prefix'.
+
+       Returns: list of '{"text": ..., "type": "title" | "author"}', best match first.
+    """
+
+    if connection.vendor == "postgresql":
+        return suggest_with_trigrams(prefix, limit)
+    return get_prefix_index().search(prefix, limit)
+
+
+def suggest_with_trigrams(prefix, limit):
+    """
+       Suggestions from the 'pg_trgm' GIN indexes, prefix matches first and then by word similarity (typos).
+    """
+
+    suggestions = []
+    for field in SUGGESTION_FIELDS:
+        # 'LIKE prefix%' and '%>' (word similarity) on 'UPPER(field)' are both served by its trigram index.
+        upper_text = Upper(field)
+        score = Case(
+            When(upper_text__startswith=prefix.upper(), then=Value(1.0)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ) + TrigramWordSimilarity(prefix, upper_text)
+
+        rows = (
+            Book.objects.annotate(upper_text=upper_text)
+            .filter(Q(upper_text__startswith=prefix.upper()) | Q(upper_text__trigram_word_similar=prefix))
+            .values(text=F(field))
+            .annotate(score=Max(score))
+            .order_by("-score", "text")[:limit]
+        )
+        suggestions += [(row["score"], row["text"], field) for row in rows]
+
+    suggestions.sort(key=lambda suggestion: (-suggestion[0], suggestion[1]))
+    return [{"text": text, "type": field} for _, text, field in suggestions[:limit]]
+
+
+class PrefixIndex:
+    """
+       In-process index of titles and authors, used when 'pg_trgm' isn't available (Ex: SQLite).
+    """
+
+    def __init__(self, entries):
+        # sorted (lowercase text from each word, text, type), so all texts with a prefix are next to each other.
+        keys = set()
+        for text, field in entries:
+            if not text:
+                continue
+
+            words = text.lower().split()
+            for i in range(len(words)):
+                keys.add((" ".join(words[i:]), text, field))
+        self.keys = sorted(keys)
+
+        # distinct beginnings of the keys by length, grouped by their first and second characters
+        # (built by the first typo search of each prefix length).
+        self.heads = {}
+
+    def get_heads(self, prefix):
+        """
+           Beginnings of the keys that could be 'prefix' with a typo: the first or the second character is the same.
+        """
+
+        length = len(prefix)
+        if length not in self.heads:
+            groups = {}
+            for head in dict.fromkeys(key[0][:length] for key in self.keys):
+                for position in range(min(2, len(head))):
+                    groups.setdefault((position, head[position]), []).append(head)
+            self.heads[length] = groups
+
+        groups = self.heads[length]
+        return list(
+            dict.fromkeys(
+                head for position in range(min(2, length)) for head in groups.get((position, prefix[position]), [])
+            )
+        )
+
+    def search(self, prefix, limit):
+        prefix = prefix.lower()
+
+        # texts with a word starting with 'prefix'.
+        matches = []
+        i = bisect_left(self.keys, (prefix,))
+        while i < len(self.keys) and self.keys[i][0].startswith(prefix) and len(matches) < limit:
+            if self.keys[i][1:] not in matches:
+                matches.append(self.keys[i][1:])
+            i += 1
+
+        # typo tolerance: texts with a word whose beginning is close to 'prefix'.
+        if len(matches) < limit:
+            for head in difflib.get_close_matches(prefix, self.get_heads(prefix), n=limit, cutoff=0.7):
+                i = bisect_left(self.keys, (head,))
+                while i < len(self.keys) and self.keys[i][0][: len(prefix)] == head and len(matches) < limit:
+                    if self.keys[i][1:] not in matches:
+                        matches.append(self.keys[i][1:])
+                    i += 1
+
+        return [{"text": text, "type": field} for text, field in matches[:limit]]
+
+
+# Prefix index of the process, rebuilt when the catalogue version changes.
+_prefix_index = {"version": None, "index": None}
+_prefix_index_lock = threading.Lock()
+
+
+def get_prefix_index():
+    version = get_catalogue_version()
+
+    with _prefix_index_lock:
+        if _prefix_index["version"] != version:
+            entries = []
+            for field in SUGGESTION_FIELDS:
+                entries += [
+                    (text, field) for text in Book.objects.values_list(field, flat=True).distinct()
+                ]
+
+            _prefix_index["index"] = PrefixIndex(entries)
+            _prefix_index["version"] = version
+
+        return _prefix_index["index"]
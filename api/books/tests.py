@@ -0,0 +1,127 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from books.models import Book, Image
+from comments.models import Comment
+from users.models import Gender, Tag, User, UserImage
+from api_config.utils.m2m_utils import update_m2m
+
+
+class QueryCountTestCase(TestCase):
+    """
+       Books, images, categories and comments of two users, to count the queries of the book endpoints.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for name in ["male", "female", "others", "prefer not to say"]:
+            Gender.objects.create(name=name)
+
+        cls.tags = [Tag.objects.create(text=text) for text in ["fiction", "science", "history"]]
+        cls.owner = User.objects.create_user("Owner", "One", "owner@example.com", "password")
+        cls.reader = User.objects.create_user("Reader", "Two", "reader@example.com", "password")
+
+        for user in [cls.owner, cls.reader]:
+            UserImage.objects.create(user=user, type="profile", url="https://example.com/p.png", filename="p")
+
+    def setUp(self):
+        # feed responses are cached, every request is counted from the database.
+        cache.clear()
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def create_books(self, count):
+        books = []
+        for i in range(count):
+            book = Book.objects.create(
+                user=self.owner,
+                title=f"Book {i}",
+                description="Description of the book",
+                address="Address",
+                city="Pune",
+                state="Maharashtra",
+                country="India",
+            )
+            book.categories.add(*self.tags)
+            Image.objects.create(book=book, url="https://example.com/b.png", filename="b")
+            books.append(book)
+        return books
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url)
+
+        self.assertEqual(res.status_code, 200)
+        return len(context)
+
+
+class FeedQueryCountTest(QueryCountTestCase):
+    def test_feed_query_count_does_not_grow_with_books(self):
+        self.create_books(2)
+        queries_with_few_books = self.count_queries("/api/books/")
+
+        self.create_books(15)
+        queries_with_more_books = self.count_queries("/api/books/")
+
+        self.assertEqual(queries_with_few_books, queries_with_more_books)
+
+
+class BookDetailQueryCountTest(QueryCountTestCase):
+    def add_comments_and_images(self, book, count):
+        for i in range(count):
+            Comment.objects.create(book=book, user=self.reader, comment=f"Comment {i}")
+            Image.objects.create(book=book, url="https://example.com/b.png", filename=f"b{i}")
+
+    def test_book_detail_query_count_does_not_grow_with_comments_or_images(self):
+        book = self.create_books(1)[0]
+        url = f"/api/books/{book.id}/"
+
+        # validators, book (with uploader), categories, images, uploader images and comments.
+        with self.assertNumQueries(6):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        # + images of the comment authors, whatever the number of comments.
+        self.add_comments_and_images(book, 1)
+        with self.assertNumQueries(7):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.add_comments_and_images(book, 15)
+        with self.assertNumQueries(7):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class UpdateM2MTest(QueryCountTestCase):
+    def test_only_the_difference_is_written(self):
+        book = self.create_books(1)[0]
+        fiction, science, history = [tag.id for tag in self.tags]
+
+        self.assertEqual(update_m2m(book, "categories", [fiction, science]), (0, 1))
+        self.assertEqual(set(book.categories.values_list("id", flat=True)), {fiction, science})
+
+        self.assertEqual(update_m2m(book, "categories", [science, history]), (1, 1))
+        self.assertEqual(set(book.categories.values_list("id", flat=True)), {science, history})
+
+        # the lock on the book and the current ids (in the savepoint of the test transaction).
+        with self.assertNumQueries(4):
+            self.assertEqual(update_m2m(book, "categories", [history, science]), (0, 0))
+
+
+class FeedCacheValidationTest(QueryCountTestCase):
+    def test_feed_changes_with_books_changed_by_another_process(self):
+        book = self.create_books(1)[0]
+        res = self.client.get("/api/books/")
+        etag = res["ETag"]
+
+        # like the image worker: the book changes, but the catalogue version of this process (its cache) doesn't.
+        Image.objects.create(book=book, url="https://example.com/new.png", filename="new")
+        Book.objects.filter(pk=book.id).touch()
+
+        res = self.client.get("/api/books/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(len(res.data["data"]["books"][0]["images"]), 2)
@@ -7,12 +7,28 @@ urlpatterns = [
     # Ex: /api/books/
     path("", views.books_controller, name="books_controller"),
 
+    # GET titles/authors suggested for a search prefix
+    # Ex: /api/books/suggest/?prefix=harr
+    path("suggest/", views.books_suggest_controller, name="books_suggest_controller"),
+
+    # GET books recommended for the authenticated user
+    # Ex: /api/books/recommended/
+    path("recommended/", views.books_recommended_controller, name="books_recommended_controller"),
+
+    # POST books in bulk (CSV or JSON Lines body)
+    # Ex: /api/books/import/?format=csv
+    path("import/", views.books_import_controller, name="books_import_controller"),
+
+    # GET hit/miss counters of the feed cache (admin only)
+    # Ex: /api/books/cache/stats/
+    path("cache/stats/", views.books_cache_stats_controller, name="books_cache_stats_controller"),
+
     # GET, PUT, DELETE a book
     # Ex: /api/books/1/
     path("<int:book_id>/", views.book_controller, name="book_controller"),
     
-    # Add or remove a book from wishlist
-    # Ex: /api/books/1/wishlist
+    # GET if a book is in the wishlist, add (PUT) or remove (DELETE) it
+    # Ex: /api/books/1/wishlist/
     path("<int:book_id>/wishlist/", views.book_wishlist_controller, name="book_wishlist_controller"),
     
     # All Comments endpoint
@@ -1,13 +1,23 @@
-from django.db.models import Q
-from django.shortcuts import get_object_or_404
+import codecs
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q
 
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes, parser_classes
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, IsAdminUser
 from rest_framework.parsers import MultiPartParser
 
-from users.models import Tag
-from books.models import Book, Image, WishList
+from users.reference_data import get_tag_ids
+from books.models import Book, Image, ImageJob, Recommendation, WishList
+from books.recommendations import queue_book_recommendations
+from books.image_jobs import enqueue_book_images, enqueue_image_deletes
+from books.importer import IMPORT_FORMATS, import_books, read_rows
+from comments.models import Comment
+from comments.serializers import CommentDetailSerializer
+from books.suggestions import suggest
 from books.serializers import (
     BookSerializer,
     BookDetailSerializer,
@@ -15,10 +25,71 @@ from books.serializers import (
     ImageSerializer,
 )
 from api_config.utils.cloudinary_utils import (
-    delete_image,
-    delete_multiple_images,
     upload_multiple_book_images,
+    ImageUploadError,
+    InvalidImageError,
+)
+from api_config.utils.pagination import InvalidCursor, get_page_size, paginate_by_cursor
+from api_config.utils.cache_utils import (
+    bump_catalogue_version,
+    cache_feed,
+    get_cached_feed,
+    get_feed_cache_key,
+    get_catalogue_version,
+    get_feed_cache_stats,
 )
+from api_config.utils.isbn_utils import normalize_isbn
+from api_config.utils.m2m_utils import update_m2m
+from api_config.utils.etag_utils import is_not_modified, make_etag, not_modified_response
+
+
+def filter_books(books, query_params):
+    """
+       Filter 'books' by categories, location, sale/exchange status, price range and ISBN.
+
+       Raises 'ValueError' (with the error message) if a filter is invalid.
+
+       Params:
+         books --> 'Book' queryset
+         query_params --> query params of the request (all filters are optional)
+    """
+
+    categories = query_params.getlist("categories")
+    if categories:
+        books = books.with_categories(categories)
+
+    # location of the book.
+    for location in ["city", "state", "country"]:
+        value = query_params.get(location, "").strip()
+        if value:
+            books = books.filter(**{location: value})
+
+    # sale/exchange status of the book.
+    for_sale = query_params.get("for_sale", None)
+    if for_sale in ["true", "false"]:
+        books = books.filter(for_sale=(for_sale == "true"))
+
+    # price range.
+    try:
+        price_min = query_params.get("price_min", None)
+        if price_min:
+            books = books.filter(price__gte=Decimal(price_min))
+
+        price_max = query_params.get("price_max", None)
+        if price_max:
+            books = books.filter(price__lte=Decimal(price_max))
+    except InvalidOperation:
+        raise ValueError("Invalid price range")
+
+    # all listings of the same edition (ISBN-10 and ISBN-13 are matched).
+    isbn = query_params.get("isbn", None)
+    if isbn:
+        isbn_canonical = normalize_isbn(isbn)
+        if isbn_canonical is None:
+            raise ValueError("Invalid ISBN")
+        books = books.filter(isbn_canonical=isbn_canonical)
+
+    return books
 
 
 @api_view(["GET", "POST"])  # Allowed methods
@@ -30,21 +101,77 @@ def books_controller(req):
 
     # GET all the books saved
     if req.method == "GET":
-        books = Book.objects.prefetch_related(
-            "categories", "user", "images", "comments"
-        ).all()
+        books = Book.objects.for_feed()
 
         # if request is for particular user, send their books (uploads)
         for_user = req.query_params.get("user", "false")
+        cache_key = None
+        etag = None
 
         if for_user == "true":
             user_id = req.user.id
             books = books.filter(user__id=user_id, for_sale=False)
+        else:
+            # public feed is the same for every visitor. It changes with the catalogue version (bumped by this process)
+            # and with the latest change and number of the books (changed by any process, the cache is per process).
+            cache_key = get_feed_cache_key(req.query_params, *Book.objects.catalogue_state())
+            etag = make_etag(cache_key)
+
+            if is_not_modified(req, etag):
+                return not_modified_response(etag)
+
+            # send it from cache if present.
+            data = get_cached_feed(cache_key)
+            if data is not None:
+                return Response(data={"data": data}, status=200, headers={"ETag": etag})
+
+        # filters of the feed.
+        try:
+            books = filter_books(books, req.query_params)
+        except ValueError as e:
+            return Response(data={"error": {"message": str(e)}}, status=400)
+
+        # full-text search, most relevant books first.
+        keyset = ("created_on", "id")
+        search_text = req.query_params.get("q", "").strip()
+
+        if search_text:
+            books = books.search(search_text)
+            keyset = ("rank", "id")
+
+        # user's own books aren't cached, they are validated by their latest change and count.
+        if etag is None:
+            state = books.aggregate(last_modified=Max("last_modified"), count=Count("id"))
+            etag = make_etag(
+                user_id, get_feed_cache_key(req.query_params), state["last_modified"], state["count"]
+            )
 
-        # retrieve books --> serialize --> JSON response
-        
-        serializer = BookSerializer(books, many=True)
-        return Response(data={"data": {"books": serializer.data}}, status=200)
+            if is_not_modified(req, etag):
+                return not_modified_response(etag)
+
+        # retrieve a page of books (newest/most relevant first) --> serialize --> JSON response
+        try:
+            page, next_cursor, has_more = paginate_by_cursor(
+                books, req.query_params, keyset
+            )
+        except InvalidCursor:
+            return Response(data={"error": {"message": "Invalid cursor"}}, status=400)
+
+        serializer = BookSerializer(page, many=True)
+        data = {
+            "books": serializer.data,
+            "next": next_cursor,
+            "has_more": has_more,
+        }
+
+        # facet counts (per category and city) are sent with the first page only.
+        if not req.query_params.get("cursor", None):
+            data["facets"] = books.facet_counts()
+
+        if cache_key is not None:
+            cache_feed(cache_key, data)
+
+        return Response(data={"data": data}, status=200, headers={"ETag": etag})
 
     # POST a book (user should be authenticated)
     # accepts form-data
@@ -63,37 +190,31 @@ def books_controller(req):
             return Response(data={'error': { 'message': 'Upload images of the book' }}, status=400)
 
         if book_serializer.is_valid():
-            # save book to DB if serialized successfully. (valid data)
-            book = book_serializer.save()
+            # book, its categories and its queued images are saved together.
+            with transaction.atomic():
+                # save book to DB if serialized successfully. (valid data)
+                book = book_serializer.save()
 
-            # save all the categories associated with the book.
-            categories_allowed = Tag.objects.filter(
-                text__in=req.data.getlist("categories")
-            )
-            book.categories.add(*categories_allowed)
+                # save all the categories associated with the book.
+                book.categories.add(*get_tag_ids(req.data.getlist("categories")))
 
-            # upload images posted with the book. (max 4)
-            all_images = upload_multiple_book_images(
-                uploaded_images, book, "book-images/"
-            )
+                # queue images posted with the book, uploaded by the worker. (max 4)
+                enqueue_book_images(book, uploaded_images[:4], "book-images/")
 
-            # save image details to DB if serialized successfully.
-            image_serializer = ImageSerializer(data=all_images, many=True)
-            if image_serializer.is_valid():
-                image_serializer.save()
-            else:
-                return Response(
-                    data={"error": {'message': image_serializer.errors}},
-                    status=500,
-                )
+                # scores of the book are computed by the recommendations worker.
+                queue_book_recommendations(book.id)
+
+            # new book is shown in the feed.
+            bump_catalogue_version()
             return Response(
                 data={
                     "data": {
                         "message": "Successfully uploaded book",
                         "book_id": book.id,
+                        "images_status": "pending",
                     }
                 },
-                status=200,
+                status=202,
             )
         else:
             return Response(data={"error": {'message': book_serializer.errors}}, status=400)
@@ -109,24 +230,42 @@ def book_controller(req, **kwargs):
 
     # GET information of a single book
     if req.method == "GET":
+        # validate the book (with its comments and wishlist status) before loading and serializing it.
+        validators = Book.objects.filter(pk=book_id).validators(user.id).first()
+        if validators is None:
+            return Response(
+                data={"error": {"message": "Resource not found"}}, status=404
+            )
+
+        etag = make_etag(get_catalogue_version(), *validators.values())
+        if is_not_modified(req, etag):
+            return not_modified_response(etag)
+
         try:
-            book = Book.objects.prefetch_related(
-                "categories", "user", "comments", "images"
-            ).get(pk=book_id)
+            book = Book.objects.for_detail(user.id).get(pk=book_id)
             book_serializer = BookDetailSerializer(book)
 
             data = book_serializer.data
 
+            # add the first page of comments (next pages from '/api/books/<id>/comments/').
+            comments, next_cursor, has_more = paginate_by_cursor(
+                Comment.objects.for_book(book_id), {}
+            )
+            data['comments'] = CommentDetailSerializer(comments, many=True).data
+            data['comments_next'] = next_cursor
+
             # add if the book is present in the 'wishlist of the user'
-            wishlist_qs = WishList.objects.prefetch_related('book', 'user')
-            in_wishlist = wishlist_qs.filter(book__id=book_id, user__id=user.id)
-            
-            if in_wishlist:
-                data['in_wishlist'] = True
+            data['in_wishlist'] = book.in_wishlist
+
+            # add if images posted with the book are still being uploaded.
+            if book.images_failed:
+                data['images_status'] = "failed"
+            elif book.images_pending:
+                data['images_status'] = "pending"
             else:
-                data['in_wishlist'] = False
+                data['images_status'] = "done"
 
-            return Response(data={"data": {"book": data}}, status=200)
+            return Response(data={"data": {"book": data}}, status=200, headers={"ETag": etag})
         except Book.DoesNotExist:
             return Response(
                 data={"error": {"message": "Resource not found"}}, status=404
@@ -140,7 +279,10 @@ def book_controller(req, **kwargs):
 
             # Check if the 'book' object exists.
             book = Book.objects.prefetch_related("user", "images").get(pk=book_id)
-            number_of_images_stored = len(book.images.all())
+            # images still queued for upload count as stored.
+            number_of_images_stored = len(book.images.all()) + book.image_jobs.filter(
+                action=ImageJob.UPLOAD, status=ImageJob.PENDING
+            ).count()
 
             # If the 'book' owner is different from authenticated user, do not allow to update.
             if book.user.id != req.user.id:
@@ -150,14 +292,12 @@ def book_controller(req, **kwargs):
             images_to_delete = req.data.getlist("delete_images")
             number_of_images_to_delete = len(images_to_delete)
 
-            # Delete images from DB.
-            Image.objects.filter(
+            # Delete images (of this book only) from cloud and DB.
+            images = Image.objects.filter(
                 Q(filename__in=images_to_delete), Q(book=book_id)
-            ).delete()
-
-            # Delete images from cloud.
-            for image in images_to_delete:
-                res = delete_image(image)
+            )
+            enqueue_image_deletes(images)
+            images.delete()
 
             # Get new images to save from request-data
             images_to_upload = req.data.getlist("images")
@@ -168,29 +308,49 @@ def book_controller(req, **kwargs):
             )
 
             # Save new images to cloud
-            all_images = upload_multiple_book_images(
-                images_to_upload, book, "book-images/", number_of_images_to_save
-            )
+            try:
+                all_images = upload_multiple_book_images(
+                    images_to_upload, book, "book-images/", number_of_images_to_save
+                )
+            except ImageUploadError as error:
+                # deleted images are not shown in the feed anymore.
+                Book.objects.filter(pk=book.id).touch()
+                bump_catalogue_version()
+                if isinstance(error.__cause__, InvalidImageError):
+                    return Response(data={"error": {"message": "Upload valid images"}}, status=400)
+                return Response(
+                    data={"error": {"message": "Couldn't upload images, try again"}},
+                    status=502,
+                )
 
             # Save new images to DB if serialized successfully
             image_serializer = ImageSerializer(data=all_images, many=True)
-            if image_serializer.is_valid():
+            image_serializer_is_valid = image_serializer.is_valid()
+            if image_serializer_is_valid:
                 image_serializer.save()
-            else:
+
+            # images shown in the feed changed.
+            Book.objects.filter(pk=book.id).touch()
+            bump_catalogue_version()
+
+            if not image_serializer_is_valid:
                 return Response(
                     data={"error": {"message": image_serializer.errors}},
                     status=500,
                 )
 
-            # Update all the 'categories' from the book
-            book.categories.clear()  # remove existing categories
-            new_categories = Tag.objects.filter(text__in=req.data.getlist("categories"))
-            book.categories.add(*new_categories)
+            # Update the 'categories' of the book (only the added/removed ones are written)
+            added, removed = update_m2m(book, "categories", get_tag_ids(req.data.getlist("categories")))
+            if added or removed:
+                queue_book_recommendations(book.id)
 
             # Update the book data in DB.
             book_serializer = BookPostSerializer(book, data=req.data, partial=True)
             if book_serializer.is_valid():
                 book = book_serializer.save()
+
+                # details shown in the feed changed.
+                bump_catalogue_version()
                 return Response(
                     data={
                         "data": {
@@ -223,10 +383,11 @@ def book_controller(req, **kwargs):
                 return Response(data={"error": {"message": "Forbidden"}}, status=403)
 
             # Delete 'images' related to book from cloud.
-            delete_multiple_images(book.images.all())
+            enqueue_image_deletes(book.images.all())
 
             # Delete 'book' from DB along with it 'comments', 'images'
             book_queryset.filter(pk=book_id).delete()
+            bump_catalogue_version()
 
             return Response(
                 data={"data": {"message": "Successfully deleted the book."}}, status=200
@@ -236,28 +397,109 @@ def book_controller(req, **kwargs):
                 data={"error": {"message": "Resource not found"}}, status=404
             )
 
-@api_view(["GET"])
+@api_view(["GET", "PUT", "DELETE"])
 @permission_classes([IsAuthenticated])
 def book_wishlist_controller(req, **kwargs):
     # get user and book
     user = req.user
     book_id = kwargs['book_id']
 
+    # GET if the book is present in the wishlist of the user.
+    if req.method == "GET":
+        in_wishlist = WishList.objects.filter(user=user.id, book=book_id).exists()
+        return Response(data={'data': {'in_wishlist': in_wishlist}}, status=200)
+
+    # DELETE the book from the wishlist (a single 'DELETE', nothing happens if it is not there).
+    if req.method == "DELETE":
+        WishList.objects.remove_books(user.id, [book_id])
+        return Response(data={'data': {'message': 'Book removed from wishlist'}}, status=200)
+
+    # PUT the book in the wishlist ('INSERT ... ON CONFLICT DO NOTHING', repeated requests add it once).
     # if the book does not exist return error
-    book = get_object_or_404(Book, pk=book_id)
+    owner_id = Book.objects.filter(pk=book_id).values_list("user_id", flat=True).first()
+    if owner_id is None:
+        return Response(data={"error": {"message": "Resource not found"}}, status=404)
 
-    # if the user is trying to add/delete own book from wishlist, return error.
-    if book.user == user:
+    # if the user is trying to add own book to wishlist, return error.
+    if owner_id == user.id:
         return Response(data={'error': {'message': "Couldn't modify wishlist"}}, status=400)
 
-    wishlist_qs = WishList.objects.all()
+    WishList.objects.bulk_create([WishList(user_id=user.id, book_id=book_id)], ignore_conflicts=True)
+    return Response(data={'data': {'message': 'Book added to wishlist'}}, status=200)
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def books_recommended_controller(req):
+    # GET books recommended for the user (precomputed from their interests), best match first.
+    limit = get_page_size(req.query_params)
+    scores = dict(
+        Recommendation.objects.filter(user_id=req.user.id)
+        .order_by("-score", "-book_id")
+        .values_list("book_id", "score")[:limit]
+    )
+
+    books = Book.objects.for_feed().filter(id__in=scores.keys())
+    books = sorted(books, key=lambda book: (-scores[book.id], -book.id))
+
+    serializer = BookSerializer(books, many=True)
+    return Response(data={"data": {"books": serializer.data}}, status=200)
+
+
+@api_view(["GET"])
+def books_suggest_controller(req):
+    # GET titles/authors suggested while typing (typo tolerant).
+    prefix = req.query_params.get("prefix", "").strip()
+    if not prefix:
+        return Response(data={"data": {"suggestions": []}}, status=200)
+
+    suggestions = suggest(prefix, settings.SUGGESTIONS_LIMIT)
+    return Response(data={"data": {"suggestions": suggestions}}, status=200)
+
+
+# Content types of the bulk import formats
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/jsonl": "jsonl",
+    "application/x-ndjson": "jsonl",
+    "application/x-jsonlines": "jsonl",
+}
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def books_import_controller(req):
+    # POST books in bulk (owned by the authenticated user), body is a CSV or JSON Lines stream.
+    # format is taken from 'format' query param or the 'Content-Type' header.
+    content_type = req.content_type.split(";")[0].strip()
+    import_format = req.query_params.get("format", IMPORT_CONTENT_TYPES.get(content_type, None))
+    if import_format not in IMPORT_FORMATS:
+        return Response(
+            data={"error": {"message": "Send books as CSV (text/csv) or JSON Lines (application/x-ndjson)"}},
+            status=415,
+        )
+
+    # body is read line by line (never loaded at once) and decoded lazily.
+    if req.stream is None:
+        return Response(data={"error": {"message": "Send books to import"}}, status=400)
+    lines = codecs.iterdecode(req.stream, "utf-8-sig")
 
     try:
-        # if book is already present in the wishlist remove it
-        book_in_wishlist = wishlist_qs.get(Q(book=book_id), Q(user=user.id))
-        wishlist_qs.filter(Q(book=book_id), Q(user=user.id)).delete()
-        return Response(data={'data': {'message': 'Book removed from wishlist'} }, status=200)
-    except:
-        # if book is not present in the wishlist add it
-        wishlist_qs.create(user=user, book=book)
-        return Response(data={'data': {'message': 'Book added to wishlist'}}, status=200)
\ No newline at end of file
+        result = import_books(read_rows(lines, import_format), req.user)
+    except UnicodeDecodeError:
+        return Response(data={"error": {"message": "Books should be UTF-8 encoded"}}, status=400)
+
+    return Response(data={"data": result}, status=200)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def books_cache_stats_controller(req):
+    # GET hit/miss counters of the feed cache (for monitoring).
+    return Response(
+        data={
+            "data": {
+                "cache": get_feed_cache_stats(),
+            }
+        },
+        status=200,
+    )
@@ -0,0 +1,23 @@
+# Generated by Django 4.1 on 2026-10-18 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="comment",
+            name="created_on",
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name="comment",
+            name="last_modified",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.1 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0003_timestamps_datetime"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["book", "-created_on", "-id"], name="comments_book_created_idx"
+            ),
+        ),
+    ]
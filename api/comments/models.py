@@ -4,6 +4,19 @@ from users.models import User
 from books.models import Book
 
 
+class CommentQuerySet(models.QuerySet):
+    """
+    Queries used to list 'comments'.
+    """
+
+    def for_book(self, book_id):
+        """
+        Comments of a book with their authors (joined) and authors' images, for 'CommentDetailSerializer'.
+        """
+
+        return self.filter(book_id=book_id).select_related("user").prefetch_related("user__images")
+
+
 class Comment(models.Model):
     """
     Comments of the book
@@ -17,8 +30,10 @@ class Comment(models.Model):
     comment = models.CharField(max_length=300)
 
     # timestamps
-    created_on = models.DateField(auto_now_add=True)
-    last_modified = models.DateField(auto_now=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+    last_modified = models.DateTimeField(auto_now=True)
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         db_table = "book_comments"
@@ -27,3 +42,7 @@ class Comment(models.Model):
                 check=~models.Q(comment=""), name="non_empty_comment_body"
             ),
         ]
+        indexes = [
+            # comments of a book, newest first (keyset pagination).
+            models.Index(fields=["book", "-created_on", "-id"], name="comments_book_created_idx"),
+        ]
@@ -13,6 +13,10 @@ class CommentDetailSerializer(serializers.ModelSerializer):
 
     user = UserDetailSerializer()
 
+    # timestamps are stored with time, but sent as dates.
+    created_on = serializers.DateTimeField(format="%Y-%m-%d", read_only=True)
+    last_modified = serializers.DateTimeField(format="%Y-%m-%d", read_only=True)
+
     class Meta:
         model = Comment
         fields = "__all__"
@@ -3,7 +3,7 @@ from . import views
 
 app_name = "comments"
 urlpatterns = [
-    # POST comment
+    # GET comments (paginated) & POST comment
     # Ex: /api/books/1/comments/
     path("", views.comment_post_controller, name="comment_controller"),
     
@@ -4,15 +4,40 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from books.models import Book
-from comments.serializers import CommentPostSerializer
+from comments.serializers import CommentDetailSerializer, CommentPostSerializer
 from comments.models import Comment
+from api_config.utils.pagination import InvalidCursor, paginate_by_cursor
 
 
-@api_view(["POST"])  # Allowed HTTP methods.
+@api_view(["GET", "POST"])  # Allowed HTTP methods.
 @permission_classes([IsAuthenticated])  # Required permissions.
 def comment_post_controller(req, *args, **kwargs):
     book_id = kwargs["book_id"]
 
+    # GET a page of comments of the book (newest first).
+    if req.method == "GET":
+        if not Book.objects.filter(pk=book_id).exists():
+            return Response(data={"error": {"message": "Resource not found."}}, status=404)
+
+        try:
+            comments, next_cursor, has_more = paginate_by_cursor(
+                Comment.objects.for_book(book_id), req.query_params
+            )
+        except InvalidCursor:
+            return Response(data={"error": {"message": "Invalid cursor"}}, status=400)
+
+        comment_serializer = CommentDetailSerializer(comments, many=True)
+        return Response(
+            data={
+                "data": {
+                    "comments": comment_serializer.data,
+                    "next": next_cursor,
+                    "has_more": has_more,
+                }
+            },
+            status=200,
+        )
+
     # POST a comment to book.
     if req.method == "POST":
         # Check if the book is in the DB.
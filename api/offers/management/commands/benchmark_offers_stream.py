@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from books.models import Book
+from offers.models import Offer
+from offers.serializers import OfferPostedSerializer
+from api_config.utils.benchmark_utils import create_benchmark_user, measure, rolled_back
+from api_config.utils.streaming import stream_json_list
+
+
+def stream_offers(queryset):
+    # consume the streamed response like a client would, keeping only its size.
+    return sum(len(chunk) for chunk in stream_json_list(queryset, OfferPostedSerializer, "offers"))
+
+
+def render_offers(queryset):
+    # the whole list serialized at once (the response before streaming).
+    return len(JSONRenderer().render({"data": {"offers": OfferPostedSerializer(queryset, many=True).data}}))
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure time and peak Python memory of the offers list, streamed and rendered at once, "
+        "as the number of offers grows (the data is rolled back)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Numbers of offers to list."
+        )
+        parser.add_argument(
+            "--skip-rendered", action="store_true", help="Only measure the streamed response."
+        )
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            seller = create_benchmark_user("benchmark-seller@example.com")
+            buyer = create_benchmark_user("benchmark-buyer@example.com")
+
+            created = 0
+            for size in sorted(options["sizes"]):
+                books = Book.objects.bulk_create(
+                    [
+                        Book(
+                            user=seller,
+                            title=f"Book {i}",
+                            description="Description of the book",
+                            address="Address",
+                            city="Pune",
+                            state="Maharashtra",
+                            country="India",
+                        )
+                        for i in range(created, size)
+                    ]
+                )
+                Offer.objects.bulk_create([Offer(buyer=buyer, posted_book=book) for book in books])
+                created = size
+
+                offers = Offer.objects.filter(buyer=buyer).select_related(
+                    "buyer", "posted_book__user", "exchange_book__user"
+                ).prefetch_related(
+                    "posted_book__images",
+                    "posted_book__user__images",
+                    "exchange_book__images",
+                    "exchange_book__user__images",
+                )
+
+                length, seconds, peak = measure(stream_offers, offers)
+                self.stdout.write(
+                    f"{size} offers streamed: {length} bytes in {seconds:.2f}s, peak memory {peak / 2**20:.1f} MiB"
+                )
+
+                if not options["skip_rendered"]:
+                    length, seconds, peak = measure(render_offers, offers)
+                    self.stdout.write(
+                        f"{size} offers rendered at once: {length} bytes in {seconds:.2f}s, "
+                        f"peak memory {peak / 2**20:.1f} MiB"
+                    )
@@ -38,15 +38,10 @@ class OfferPostedSerializer(serializers.ModelSerializer):
     
    # Serializer: fields returned: all fields with their details fetched. Buyer info is replaced by seller info. 
    
-    seller = serializers.SerializerMethodField("get_seller")
+    seller = UserSerializer(source="get_seller", read_only=True)
     posted_book = BookSerializer()
     exchange_book = BookSerializer()
 
     class Meta:
         model = Offer
         fields = ["posted_book", "exchange_book", "for_purchase", "price", "description", "seller", "status"]
-
-    def get_seller(self, offer):
-        seller_obj = offer.get_seller()
-        seller = UserSerializer(seller_obj).data 
-        return seller
\ No newline at end of file
@@ -14,6 +14,7 @@ from offers.serializers import (
 )
 
 from api_config.utils.send_email import send_email
+from api_config.utils.streaming import stream_json_list
 
 @api_view(["GET", "POST"])
 # @permission_classes([IsAuthenticated])
@@ -25,29 +26,29 @@ def offers_controller(req):
     if req.method == "GET":
         get_received_offers = req.query_params.get("received", "false")
 
-        offer_queryset = Offer.objects.prefetch_related(
-            "buyer", "posted_book", "exchange_book"
+        # join buyer, books and their owners, prefetch images of books and owners (per chunk).
+        offer_queryset = Offer.objects.select_related(
+            "buyer", "posted_book__user", "exchange_book__user"
+        ).prefetch_related(
+            "posted_book__images",
+            "posted_book__user__images",
+            "exchange_book__images",
+            "exchange_book__user__images",
         )
 
         # GET all offers received by the user.
         if get_received_offers == "true":
             received_offers = offer_queryset.filter(posted_book__user=user.id)
 
-            # serialize retrieved data and send a response
-            offers_serializer = OfferRecievedSerializer(received_offers, many=True)
-            return Response(
-                data={"data": {"offers": offers_serializer.data}}, status=200
-            )
+            # serialize retrieved data and stream the response
+            return stream_json_list(received_offers, OfferRecievedSerializer, "offers")
 
         # GET all offers posted by the user.
         else:
             posted_offers = offer_queryset.filter(buyer=user.id)
 
-            # serialize retrieved data and send a response
-            offers_serializer = OfferPostedSerializer(posted_offers, many=True)
-            return Response(
-                data={"data": {"offers": offers_serializer.data}}, status=200
-            )
+            # serialize retrieved data and stream the response
+            return stream_json_list(posted_offers, OfferPostedSerializer, "offers")
 
     # POST a offer based on sale/exchange status.
     elif req.method == "POST":
@@ -60,7 +61,7 @@ def offers_controller(req):
         )
 
         # If the buyer == seller, return error
-        if user == posted_book.user:
+        if user.id == posted_book.user_id:
             return Response(
                 data={"error": {"message": "Buyer and seller are same, couldn't continue"}},
                 status=400,
@@ -122,7 +123,7 @@ def offers_controller(req):
             # if both books are not for exchange OR
             # if exchange_book doesn't belong to the buyer return error.
             if (exchange_book.for_sale != posted_book.for_sale) or (
-                exchange_book.user != user
+                exchange_book.user_id != user.id
             ):
                 return Response({"error": {"message": "Couldn't make offer"}}, status=400)
             else:
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class JwtauthConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "users"
+
+    def ready(self):
+        # invalidate the cached tags and genders when they change.
+        from users import signals
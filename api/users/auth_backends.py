@@ -1,24 +1,32 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
 
+from api_config.utils.password_utils import run_default_hasher, verify_password
+
 class EmailBackend(ModelBackend):
     """
         Custom Backend to authenticate user based on email and password fields.
+
+        It's the only configured backend, so a login runs a single lookup and a single password hash
+        (in the hashing pool, see 'password_utils'). Permissions are inherited from 'ModelBackend'.
     """
-    def authenticate(self, request, **kwargs):
+    def authenticate(self, request, username=None, password=None, **kwargs):
         UserModel = get_user_model()
 
-        try:
-            # check if the email field is empty.
-            email = kwargs.get('email', None)
-            if email is None:
-                return None
+        # check if the email field is empty ('username' is sent by the admin login form).
+        email = kwargs.get(UserModel.USERNAME_FIELD, username)
+        if email is None or password is None:
+            return None
 
-            # check if the password field matches with the password saved in database.
-            user = UserModel.objects.get(email__exact=email)
-            if user.check_password(kwargs.get('password', None)):
-                return user
+        try:
+            # any casing of the email (lookup on the unique index of 'lower(email)').
+            user = UserModel._default_manager.get_by_natural_key(email)
         except UserModel.DoesNotExist:
+            # hash anyway, so unknown emails can't be told apart by the response time.
+            run_default_hasher(password)
             return None
-            
-        return None
\ No newline at end of file
+
+        # check if the password field matches with the password saved in database.
+        if verify_password(user, password) and self.user_can_authenticate(user):
+            return user
+        return None
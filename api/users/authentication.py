@@ -0,0 +1,109 @@
+import threading
+import time
+
+from django.conf import settings
+from django.utils.functional import LazyObject, empty
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from users.models import User
+
+# Claims of the access token answered without loading the user (see 'MyTokenObtainPairSerializer')
+USER_CLAIMS = ["first_name", "last_name"]
+
+# Users loaded by this process (id --> (expiry time, user)), kept for 'AUTH_USER_CACHE_TTL' seconds.
+_users = {}
+_users_lock = threading.Lock()
+
+
+def get_cached_user(user_id):
+    """
+       Get the active user with 'user_id', from the process cache or the database.
+
+       Raises: 'AuthenticationFailed' if the user doesn't exist or is inactive.
+    """
+
+    now = time.monotonic()
+    with _users_lock:
+        expires, user = _users.get(user_id, (0, None))
+        if expires > now:
+            return user
+
+    try:
+        user = User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+    except User.DoesNotExist:
+        raise AuthenticationFailed("User not found", code="user_not_found")
+
+    if not user.is_active:
+        raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+    with _users_lock:
+        # drop the oldest users when the cache is full.
+        while len(_users) >= settings.AUTH_USER_CACHE_SIZE:
+            _users.pop(next(iter(_users)))
+        _users[user_id] = (now + settings.AUTH_USER_CACHE_TTL, user)
+
+    return user
+
+
+def forget_cached_user(user_id):
+    """
+       Drop the user from the cache of this process (other processes keep it until it expires).
+    """
+
+    with _users_lock:
+        _users.pop(user_id, None)
+
+
+class LazyUser(LazyObject):
+    """
+       'req.user' built from the claims of the access token.
+
+       'id', 'pk', the name and 'is_authenticated' are read from the token, the 'User' is only loaded
+       (with 'get_cached_user') when any other attribute is accessed, or when it's compared with a model instance.
+    """
+
+    def __init__(self, user_id, token):
+        super().__init__()
+        self.__dict__["_user_id"] = user_id
+        self.__dict__["_claims"] = {
+            "id": user_id,
+            "pk": user_id,
+            "is_authenticated": True,
+            "is_anonymous": False,
+            **{claim: token[claim] for claim in USER_CLAIMS if claim in token},
+        }
+
+    def _setup(self):
+        self._wrapped = get_cached_user(self.__dict__["_user_id"])
+
+    def __getattr__(self, name):
+        claims = self.__dict__["_claims"]
+        if self._wrapped is empty and name in claims:
+            return claims[name]
+        return super().__getattr__(name)
+
+    def __bool__(self):
+        # checked by the permissions ('req.user and req.user.is_authenticated').
+        return True
+
+    def __repr__(self):
+        return f"<LazyUser: {self.__dict__['_user_id']}>"
+
+
+class LazyJWTAuthentication(JWTAuthentication):
+    """
+       'JWTAuthentication' without a query per request: the user is built from the token claims ('LazyUser').
+
+       A deleted or deactivated user is only rejected when the user row is needed, so their access token keeps
+       working for the views that only use 'req.user.id' until it expires ('ACCESS_TOKEN_LIFETIME').
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        return LazyUser(user_id, validated_token)
@@ -0,0 +1,114 @@
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from api_config.utils.benchmark_utils import create_benchmark_user
+
+# Email and password of the benchmark user
+BENCHMARK_EMAIL = "benchmark-login@example.com"
+BENCHMARK_PASSWORD = "benchmark-password"
+
+# Logins measured: (name, email, password, expected status)
+SCENARIOS = [
+    ("correct password", BENCHMARK_EMAIL, BENCHMARK_PASSWORD, 200),
+    ("wrong password", BENCHMARK_EMAIL, "wrong-password", 401),
+    ("unknown email", "unknown-benchmark-login@example.com", BENCHMARK_PASSWORD, 401),
+]
+
+# Backends configured before logins went through 'EmailBackend' only
+BOTH_BACKENDS = ["django.contrib.auth.backends.ModelBackend", "users.auth_backends.EmailBackend"]
+
+
+def login(email, password):
+    try:
+        return APIClient().post("/api/users/token/", {"email": email, "password": password}).status_code
+    finally:
+        # every thread has its own database connection.
+        connection.close()
+
+
+def login_over_http(url, email, password):
+    request = urllib.request.Request(
+        url.rstrip("/") + "/api/users/token/",
+        data=json.dumps({"email": email, "password": password}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status
+    except urllib.error.HTTPError as error:
+        return error.code
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure login throughput of a worker (logins/s through the token endpoint) for correct and failed logins. "
+        "In this process, with the email backend only and with both backends; or over HTTP, against a running "
+        "worker (Ex: 'gunicorn -w 1 api_config.wsgi') with its configured backends. "
+        "The benchmark user is deleted at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=20, help="Number of logins of each scenario.")
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=1,
+            help="Number of concurrent requests (1: a sync worker, which serves one request at a time).",
+        )
+        parser.add_argument(
+            "--url", help="Base URL of a running worker using this database (Ex: http://127.0.0.1:8000)."
+        )
+
+    def run(self, email, password, expected_status, options):
+        if options["url"]:
+            function, args = login_over_http, [[options["url"]] * options["requests"]]
+        else:
+            function, args = login, []
+
+        with ThreadPoolExecutor(max_workers=options["threads"]) as executor:
+            started = time.perf_counter()
+            statuses = list(
+                executor.map(function, *args, [email] * options["requests"], [password] * options["requests"])
+            )
+            seconds = time.perf_counter() - started
+
+        unexpected = [status for status in statuses if status != expected_status]
+        if unexpected:
+            self.stderr.write(f"{len(unexpected)} logins answered {unexpected[0]} instead of {expected_status}")
+        return options["requests"] / seconds
+
+    def handle(self, *args, **options):
+        user = create_benchmark_user(BENCHMARK_EMAIL)
+        try:
+            if options["url"]:
+                self.stdout.write(f"{options['threads']} concurrent requests to {options['url']}")
+            else:
+                self.stdout.write(
+                    f"{options['threads']} concurrent requests, hashing pool of "
+                    f"{settings.PASSWORD_HASHING_WORKERS} workers"
+                )
+            for name, email, password, expected_status in SCENARIOS:
+                if options["url"]:
+                    rps = self.run(email, password, expected_status, options)
+                    self.stdout.write(f"{name}: {rps:.1f} logins/s")
+                    continue
+
+                email_backend_rps = self.run(email, password, expected_status, options)
+                with override_settings(AUTHENTICATION_BACKENDS=BOTH_BACKENDS):
+                    both_backends_rps = self.run(email, password, expected_status, options)
+
+                self.stdout.write(
+                    f"{name}: {email_backend_rps:.1f} logins/s with the email backend, "
+                    f"{both_backends_rps:.1f} logins/s with both backends"
+                )
+        finally:
+            user.delete()
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.token_blacklist import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired refresh tokens from the outstanding tokens and the blacklist, in batches "
+        "(run it periodically, Ex: daily from a scheduler)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.TOKEN_PRUNING_BATCH_SIZE,
+            help="Number of token ids deleted in each transaction.",
+        )
+        parser.add_argument(
+            "--sleep", type=float, default=0, help="Seconds to wait between batches (to spread the load)."
+        )
+
+    def handle(self, *args, **options):
+        result = prune_expired_tokens(options["batch_size"], options["sleep"])
+
+        for table, size in result["sizes"].items():
+            self.stdout.write(
+                f"{table}: {result['sizes_before'][table]} -> {size} rows ({result['deleted'][table]} deleted)"
+            )
+        self.stdout.write(f"Pruned expired tokens in {result['seconds']}s.")
@@ -0,0 +1,23 @@
+# Generated by Django 4.1 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userimage",
+            name="medium_url",
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name="userimage",
+            name="thumbnail_url",
+            field=models.TextField(null=True),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.1 on 2026-10-18 12:21
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_tags(apps, schema_editor):
+    """
+    Move categories/interests of duplicate tags to the oldest tag with the same text and delete the duplicates.
+    """
+
+    Tag = apps.get_model("users", "Tag")
+    links = [
+        (apps.get_model("books", "Book").categories.through, "book_id"),
+        (apps.get_model("users", "User").interests.through, "user_id"),
+    ]
+
+    duplicates = (
+        Tag.objects.values("text").annotate(keep=Min("id"), count=Count("id")).filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        duplicate_ids = Tag.objects.filter(text=duplicate["text"]).exclude(id=duplicate["keep"])
+
+        for duplicate_id in duplicate_ids.values_list("id", flat=True):
+            for through, owner in links:
+                # owners already linked to the kept tag just lose the duplicate link.
+                linked = through.objects.filter(tag_id=duplicate["keep"]).values(owner)
+                through.objects.filter(tag_id=duplicate_id, **{f"{owner}__in": linked}).delete()
+                through.objects.filter(tag_id=duplicate_id).update(tag_id=duplicate["keep"])
+
+        duplicate_ids.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_userimage_variants"),
+        ("books", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tags, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="tag",
+            name="text",
+            field=models.CharField(default=None, max_length=100, unique=True),
+        ),
+    ]
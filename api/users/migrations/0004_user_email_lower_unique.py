@@ -0,0 +1,57 @@
+# Generated by Django 4.1 on 2026-10-18 12:32
+
+from django.core.management.base import CommandError
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+import django.db.models.functions.text
+
+
+def check_email_collisions(apps, schema_editor):
+    """
+    Stop before adding the index if some emails only differ by casing, listing all of them at once
+    (the accounts can't be merged automatically, they own books, offers and comments).
+    """
+
+    User = apps.get_model("users", "User")
+    users = User.objects.annotate(email_lower=Lower("email"))
+
+    collisions = (
+        users.values("email_lower")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .values("email_lower")
+    )
+    rows = (
+        users.filter(email_lower__in=collisions)
+        .order_by("email_lower", "id")
+        .values_list("email_lower", "id", "email")
+    )
+
+    if rows:
+        report = "\n".join(
+            f"  {email_lower}: user {user_id} ({email})"
+            for email_lower, user_id, email in rows
+        )
+        raise CommandError(
+            "Some users have the same email in different casing, change or delete all but one of each "
+            f"before migrating:\n{report}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_tag_text_unique"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_email_collisions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="user",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                name="unique_user_email_lower",
+            ),
+        ),
+    ]
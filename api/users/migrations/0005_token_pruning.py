@@ -0,0 +1,31 @@
+# Generated by Django 4.1 on 2026-10-18 13:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0004_user_email_lower_unique"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TokenPruning",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("result", models.JSONField()),
+            ],
+            options={
+                "db_table": "token_pruning",
+            },
+        ),
+    ]
@@ -1,8 +1,12 @@
 from django.contrib.auth.base_user import BaseUserManager
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.db.models import Value
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 
+from api_config.utils.password_utils import hash_password
+
 class CustomUserManager(BaseUserManager):
     """
         Custom user model manager where email is the unique identifier for authentication instead of usernames.
@@ -17,10 +21,20 @@ class CustomUserManager(BaseUserManager):
 
         email = self.normalize_email(email)
         user = self.model(first_name=first_name, last_name=last_name, email=email, **extra_fields)
-        user.set_password(password)
+        # hashed in the hashing pool, off the request thread.
+        user.password = hash_password(password)
         user.save()
         return user
 
+    def get_by_email(self, email):
+        """
+            Get the user with 'email' in any casing (lookup served by the unique index on 'lower(email)').
+        """
+        return self.alias(email_lower=Lower("email")).get(email_lower=Lower(Value(email)))
+
+    def get_by_natural_key(self, username):
+        return self.get_by_email(username)
+
     def create_superuser(self, first_name, last_name, email, password, **extra_fields):
         """
             Create and save a SuperUser with the given email and password.
@@ -40,7 +54,7 @@ class Tag(models.Model):
    """
       Book 'categories' and User 'interests'.
    """
-   text = models.CharField(max_length=100, default=None)
+   text = models.CharField(max_length=100, default=None, unique=True)
 
    class Meta:
     db_table = "tags"
@@ -86,6 +100,10 @@ class User(AbstractUser):
 
     class Meta:
       db_table = 'users'
+      constraints = [
+          # a single account per email, whatever its casing.
+          models.UniqueConstraint(Lower("email"), name="unique_user_email_lower"),
+      ]
 
     def __str__(self):
         return f'{self.first_name}, {self.email}'
@@ -107,6 +125,10 @@ class UserImage(models.Model):
     url = models.TextField(default=None)
     filename = models.TextField(default=None)
 
+    # smaller variants of the image (null for images uploaded before variants existed).
+    thumbnail_url = models.TextField(null=True)
+    medium_url = models.TextField(null=True)
+
     class Meta:
         db_table = "user_profile_images"
         constraints = [
@@ -115,4 +137,14 @@ class UserImage(models.Model):
                 check=~models.Q(filename=""), name="filename_required"
             ),
             models.CheckConstraint(check=models.Q(type__in=['profile', 'cover']), name="possible_user_image_types")
-        ]
\ No newline at end of file
+        ]
+
+class TokenPruning(models.Model):
+    """
+        Result of the last pruning of expired tokens ('prune_tokens'), a single row read by the monitoring stats.
+    """
+
+    result = models.JSONField()
+
+    class Meta:
+        db_table = "token_pruning"
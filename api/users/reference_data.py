@@ -0,0 +1,60 @@
+import threading
+
+from users.models import Gender, Tag
+from api_config.utils.cache_utils import bump_version, get_version
+
+# Cache key of the version of the reference data (tags and genders), shared by all the processes.
+REFERENCE_DATA_VERSION_KEY = "reference-data-version"
+
+# Reference data of the process, reloaded when the version changes.
+_reference_data = {"version": None, "tag_ids": {}, "gender_names": {}}
+_reference_data_lock = threading.Lock()
+
+
+def bump_reference_data_version():
+    """
+       Make every process reload the reference data, called after a 'Tag' or 'Gender' is saved or deleted.
+    """
+
+    bump_version(REFERENCE_DATA_VERSION_KEY)
+
+
+def get_reference_data():
+    """
+       Get the tags (text --> id) and genders (id --> name) of the process, reloaded if they are outdated.
+    """
+
+    version = get_version(REFERENCE_DATA_VERSION_KEY)
+
+    with _reference_data_lock:
+        if _reference_data["version"] != version:
+            _reference_data["tag_ids"] = dict(Tag.objects.order_by("id").values_list("text", "id"))
+            _reference_data["gender_names"] = dict(Gender.objects.order_by("id").values_list("id", "name"))
+            _reference_data["version"] = version
+
+        return _reference_data
+
+
+def get_tag_ids(texts):
+    """
+       Get ids of the tags with 'texts' (unknown texts are ignored), without a query.
+    """
+
+    tag_ids = get_reference_data()["tag_ids"]
+    return [tag_ids[text] for text in dict.fromkeys(texts) if text in tag_ids]
+
+
+def get_tags():
+    """
+       Get all the tags as '{"id": ..., "text": ...}', in order of creation.
+    """
+
+    return [{"id": tag_id, "text": text} for text, tag_id in get_reference_data()["tag_ids"].items()]
+
+
+def get_gender_names():
+    """
+       Get names of all the genders (id --> name).
+    """
+
+    return get_reference_data()["gender_names"]
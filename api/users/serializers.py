@@ -2,7 +2,10 @@ from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
-from users.models import Tag, UserImage
+from users.models import Gender, Tag, UserImage
+from users.reference_data import get_gender_names
+from users.token_blacklist import FilteredRefreshToken
+from api_config.utils.password_utils import hash_password
 from books.models import Book, WishList, Image
 
 class TagSerializer(serializers.ModelSerializer):
@@ -26,6 +29,22 @@ class UserImageSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
+class GenderField(serializers.PrimaryKeyRelatedField):
+    """
+        Gender id, validated against the cached genders (without a query).
+    """
+    def to_internal_value(self, data):
+        try:
+            gender_id = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        name = get_gender_names().get(gender_id, None)
+        if name is None:
+            self.fail("does_not_exist", pk_value=data)
+        return Gender(id=gender_id, name=name)
+
+
 class UserSerializer(serializers.ModelSerializer):
     """
     To serialize and deserialize 'user' instances.
@@ -34,6 +53,8 @@ class UserSerializer(serializers.ModelSerializer):
     # Serialization: fields returned --> id, first_name, last_name
     # Deserialization: fields returned --> all fields except 'id', interests
 
+    gender = GenderField(queryset=Gender.objects.all(), write_only=True, required=False)
+
     class Meta:
         model = get_user_model()
         fields = [
@@ -50,7 +71,8 @@ class UserSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             "first_name": {"required": True},
             "last_name": {"required": True},
-            "email": {"required": True, "write_only": True},
+            # uniqueness (in any casing) is checked by the database when the user is saved.
+            "email": {"required": True, "write_only": True, "validators": []},
             "password": {"write_only": True, "required": True},
             "gender": {"write_only": True},
             "date_of_birth": {"write_only": True},
@@ -59,15 +81,12 @@ class UserSerializer(serializers.ModelSerializer):
         }
 
     def update(self, instance, validated_data):        
-        updated_instance = super().update(instance, validated_data)
-
-        password = self.validated_data.get('password', None)
-        # set hashed password if present
+        password = validated_data.pop('password', None)
+        # set hashed password if present (hashed in the hashing pool, saved with the other fields)
         if password is not None:
-            updated_instance.set_password(password)
-            updated_instance.save()
+            instance.password = hash_password(password)
 
-        return updated_instance
+        return super().update(instance, validated_data)
 
 #################################################################
 # Added here to prevent circular dependency error
@@ -105,24 +124,26 @@ class BookSerializer(serializers.ModelSerializer):
 
 class WishListSerializer(serializers.ModelSerializer):
    """
-      Serialize each wishlist item of the user.
+      Serialize each wishlist item of the user (the user is already known from the profile).
    """
 
-   user = UserSerializer()
    book = BookSerializer()
 
    class Meta:
       model = WishList
-      fields = "__all__"
+      fields = ["id", "book"]
 
 ##################################################################
 
 class GenderNameField(serializers.RelatedField):
     """
-        Return name of gender.
+        Return name of gender (from the cached genders, the gender row is never loaded).
     """
+    def use_pk_only_optimization(self):
+        return True
+
     def to_representation(self, value):
-        return value.name
+        return get_gender_names().get(value.pk, None)
 
 class UserDetailSerializer(serializers.ModelSerializer):
     """
@@ -146,11 +167,13 @@ class CompleteUserDetailSerializer(serializers.ModelSerializer):
     To serialize and deserialize 'user' instances with additional information.
     """
 
-    # Serialization: fields returned --> id, name, phone, email, gender, dob, interests, books_uploaded, wishlist, profile-images.
+    # Serialization: fields returned --> id, name, phone, email, gender (id and name), dob, interests, number of books_uploaded and wishlist items, profile-images.
+    # (books and wishlist are paginated separately, the instance is annotated with 'books_count' and 'wishlist_count')
 
     interests = TagSerializer(many=True, read_only=True)
-    books = BookSerializer(many=True, read_only=True)
-    wishlist = WishListSerializer(many=True, read_only=True)
+    gender_name = GenderNameField(source="gender", read_only=True)
+    books_count = serializers.IntegerField(read_only=True)
+    wishlist_count = serializers.IntegerField(read_only=True)
     images = UserImageSerializer(many=True, read_only=True)
 
     class Meta:
@@ -160,16 +183,19 @@ class CompleteUserDetailSerializer(serializers.ModelSerializer):
             "first_name",
             "last_name",
             "gender",
+            "gender_name",
             "date_of_birth",
             "interests",
-            "books",
-            "wishlist",
+            "books_count",
+            "wishlist_count",
             "images",
             "bio"
         ]
 
 # Custom JWToken Serializer
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = FilteredRefreshToken
+
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import Gender, Tag, User
+from users.authentication import forget_cached_user
+from users.reference_data import bump_reference_data_version
+
+
+@receiver([post_save, post_delete], sender=Tag)
+@receiver([post_save, post_delete], sender=Gender)
+def invalidate_reference_data(sender, **kwargs):
+    # after commit, so other processes never reload the old rows under the new version.
+    # ('bulk_create' / 'update' send no signals, call 'bump_reference_data_version' after them.)
+    transaction.on_commit(bump_reference_data_version)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # the JWT authentication of this process loads the user again on next use.
+    forget_cached_user(instance.pk)
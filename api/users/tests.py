@@ -0,0 +1,164 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from books.models import Book
+from users import authentication, token_blacklist
+from users.models import Gender, Tag, User
+from users.serializers import MyTokenObtainPairSerializer
+
+
+class TokenAuthenticationQueryTest(TestCase):
+    """
+       Requests authenticated with an access token, counting the queries that load the user row.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for name in ["male", "female", "others", "prefer not to say"]:
+            Gender.objects.create(name=name)
+
+        cls.user = User.objects.create_user("Reader", "One", "reader@example.com", "password")
+        cls.user.interests.add(Tag.objects.create(text="fiction"))
+        cls.book = Book.objects.create(
+            user=User.objects.create_user("Owner", "Two", "owner@example.com", "password"),
+            title="Book",
+            description="Description of the book",
+            address="Address",
+            city="Pune",
+            state="Maharashtra",
+            country="India",
+        )
+
+    def setUp(self):
+        cache.clear()
+        authentication._users.clear()
+
+        token = MyTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def get_user_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url)
+
+        self.assertEqual(res.status_code, 200)
+        # the user row itself (joins of 'users' to list book owners are not counted).
+        return [query["sql"] for query in context if 'FROM "users" WHERE' in query["sql"]]
+
+    def test_authenticated_requests_do_not_load_the_user(self):
+        for url in ["/api/books/", f"/api/books/{self.book.id}/", "/api/books/recommended/", "/api/offers/"]:
+            with self.subTest(url=url):
+                self.assertEqual(self.get_user_queries(url), [])
+
+    def test_user_is_loaded_once_when_needed(self):
+        user = authentication.LazyUser(self.user.id, {"first_name": "Reader"})
+
+        # claims of the token are answered without a query.
+        with self.assertNumQueries(0):
+            self.assertEqual((user.id, user.first_name, user.is_authenticated), (self.user.id, "Reader", True))
+
+        # other attributes load the user, which is then cached by the process.
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, "reader@example.com")
+        with self.assertNumQueries(0):
+            self.assertEqual(authentication.LazyUser(self.user.id, {}).email, "reader@example.com")
+
+
+@override_settings(TOKEN_BLACKLIST_FILTER=True, TOKEN_BLACKLIST_FILTER_SYNC=0)
+class TokenBlacklistFilterTest(TestCase):
+    """
+       Refresh tokens checked through the Bloom filter of the process.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for name in ["male", "female", "others", "prefer not to say"]:
+            Gender.objects.create(name=name)
+
+        cls.user = User.objects.create_user("Reader", "One", "reader@example.com", "password")
+
+    def setUp(self):
+        cache.clear()
+        token_blacklist._blacklist_filter["built_at"] = None
+
+    def refresh(self, refresh_token):
+        return APIClient().post("/api/users/token/refresh/", {"refresh": str(refresh_token)})
+
+    def test_rotated_token_is_rejected(self):
+        refresh_token = MyTokenObtainPairSerializer.get_token(self.user)
+
+        self.assertEqual(self.refresh(refresh_token).status_code, 200)
+        self.assertEqual(self.refresh(refresh_token).status_code, 401)
+
+    def test_token_blacklisted_by_another_process_is_rejected(self):
+        refresh_token = MyTokenObtainPairSerializer.get_token(self.user)
+        self.assertFalse(token_blacklist.is_blacklisted(refresh_token["jti"]))
+
+        # blacklisted without this process (or the cache) knowing, after its filter was built.
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=refresh_token["jti"]))
+        cache.clear()
+
+        self.assertTrue(token_blacklist.is_blacklisted(refresh_token["jti"]))
+        self.assertEqual(self.refresh(refresh_token).status_code, 401)
+
+
+class RegisterIntegrityErrorTest(TransactionTestCase):
+    """
+       Registrations rejected by the database (foreign keys are only checked when the transaction commits).
+    """
+
+    # genders are numbered from 1 in every test.
+    reset_sequences = True
+
+    def setUp(self):
+        cache.clear()
+
+        # no gender 4 ('prefer not to say'), the default of users registered without a gender.
+        self.gender = Gender.objects.create(name="male")
+
+        User.objects.create_user("Reader", "One", "reader@example.com", "password", gender=self.gender)
+
+    def register(self, **data):
+        details = {"first_name": "New", "last_name": "User", "password": "Passw0rd!xyz", **data}
+        return APIClient().post("/api/users/register/", details)
+
+    def test_duplicate_email_is_reported(self):
+        res = self.register(email="Reader@Example.com", gender=self.gender.id)
+
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.data["error"]["message"], "User already exists")
+
+    def test_other_integrity_errors_are_not_reported_as_duplicates(self):
+        res = self.register(email="new@example.com")
+
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.data["error"]["message"], "Invalid user details")
+        self.assertFalse(User.objects.filter(email="new@example.com").exists())
+
+
+class TokenPruningTest(TestCase):
+    def test_last_pruning_is_read_from_the_database(self):
+        for name in ["male", "female", "others", "prefer not to say"]:
+            Gender.objects.create(name=name)
+        admin = User.objects.create_user("Admin", "One", "admin@example.com", "password", is_staff=True)
+
+        now = aware_utcnow()
+        OutstandingToken.objects.create(jti="expired", token="token", expires_at=now - timedelta(days=1))
+        OutstandingToken.objects.create(jti="live", token="token", expires_at=now + timedelta(days=1))
+        token_blacklist.prune_expired_tokens(batch_size=10)
+
+        # another process (Ex: a web worker) has nothing of the pruning in its cache.
+        cache.clear()
+
+        client = APIClient()
+        client.force_authenticate(admin)
+        pruning = client.get("/api/monitoring/stats/").data["data"]["token_pruning"]
+        self.assertEqual(pruning["deleted"]["outstanding_tokens"], 1)
+        self.assertEqual(pruning["sizes"]["outstanding_tokens"], 1)
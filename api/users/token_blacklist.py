@@ -0,0 +1,226 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from users.models import TokenPruning
+from api_config.utils.cache_utils import increment_counter
+
+# Cache keys of the counters of blacklist checks (answered by the filter, or by the database)
+BLACKLIST_FILTER_HITS_KEY = "token-blacklist-filter-hits"
+BLACKLIST_DB_CHECKS_KEY = "token-blacklist-db-checks"
+
+# Blacklist rows read again by each sync, in case rows with lower ids were committed after the last sync.
+SYNC_OVERLAP = 100
+
+
+class BloomFilter:
+    """
+       Set of strings that can answer "certainly not in the set" (or "maybe in the set") in constant memory.
+
+       Params:
+         capacity --> number of strings expected
+         error_rate --> probability of "maybe" for a string that isn't in the set, when 'capacity' is reached
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(math.ceil(self.size / 8))
+
+    def positions(self, text):
+        # 'hash_count' positions from two independent hashes (double hashing).
+        digest = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big")
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, text):
+        for position in self.positions(text):
+            self.bits[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, text):
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self.positions(text))
+
+
+# Filter of the blacklisted token ids (jti) of the process, rebuilt every 'TOKEN_BLACKLIST_FILTER_REFRESH' seconds
+# and synced with the blacklist rows added since (by id) every 'TOKEN_BLACKLIST_FILTER_SYNC' seconds.
+_blacklist_filter = {"built_at": None, "synced_at": None, "last_id": 0, "filter": None}
+_blacklist_filter_lock = threading.Lock()
+
+
+def add_blacklisted_rows(blacklist_filter, rows):
+    """
+       Add the '(id, jti)' blacklist rows to the filter, and move 'last_id' past them.
+    """
+
+    for row_id, jti in rows:
+        blacklist_filter.add(jti)
+        _blacklist_filter["last_id"] = max(_blacklist_filter["last_id"], row_id)
+
+
+def get_blacklist_filter():
+    """
+       Get the Bloom filter of the blacklisted (and not expired) tokens.
+
+       A token blacklisted by any process is in the filter at most 'TOKEN_BLACKLIST_FILTER_SYNC' seconds later
+       (the rows added since the last sync are read from the database, the cache is not involved).
+    """
+
+    now = time.monotonic()
+
+    with _blacklist_filter_lock:
+        built_at = _blacklist_filter["built_at"]
+        if built_at is None or now - built_at > settings.TOKEN_BLACKLIST_FILTER_REFRESH:
+            rows = list(
+                BlacklistedToken.objects.filter(token__expires_at__gt=aware_utcnow()).values_list(
+                    "id", "token__jti"
+                )
+            )
+
+            # room for the tokens blacklisted until the next rebuild.
+            blacklist_filter = BloomFilter(max(2 * len(rows), 1024))
+            _blacklist_filter["last_id"] = 0
+            add_blacklisted_rows(blacklist_filter, rows)
+
+            _blacklist_filter["filter"] = blacklist_filter
+            _blacklist_filter["built_at"] = now
+            _blacklist_filter["synced_at"] = now
+        elif now - _blacklist_filter["synced_at"] >= settings.TOKEN_BLACKLIST_FILTER_SYNC:
+            rows = BlacklistedToken.objects.filter(
+                id__gt=_blacklist_filter["last_id"] - SYNC_OVERLAP
+            ).values_list("id", "token__jti")
+            add_blacklisted_rows(_blacklist_filter["filter"], rows)
+
+            _blacklist_filter["synced_at"] = now
+
+        return _blacklist_filter["filter"]
+
+
+def is_blacklisted(jti):
+    """
+       Check if the token with 'jti' is blacklisted.
+
+       The filter of the process answers "certainly not blacklisted" without a query (see 'get_blacklist_filter'),
+       the database is only queried when the filter answers "maybe".
+    """
+
+    if not settings.TOKEN_BLACKLIST_FILTER:
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    if jti not in get_blacklist_filter():
+        increment_counter(BLACKLIST_FILTER_HITS_KEY)
+        return False
+
+    increment_counter(BLACKLIST_DB_CHECKS_KEY)
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+def remember_blacklisted(jti):
+    """
+       Make this process see the token as blacklisted right away (the others see it on their next sync).
+    """
+
+    with _blacklist_filter_lock:
+        if _blacklist_filter["filter"] is not None:
+            _blacklist_filter["filter"].add(jti)
+
+
+def get_blacklist_filter_stats():
+    """
+       Get the counters of blacklist checks (answered by the filter without a query, or by the database).
+    """
+
+    return {
+        "filter_hits": cache.get(BLACKLIST_FILTER_HITS_KEY, 0),
+        "db_checks": cache.get(BLACKLIST_DB_CHECKS_KEY, 0),
+    }
+
+
+class FilteredRefreshToken(RefreshToken):
+    """
+       Refresh token whose blacklist check goes through 'is_blacklisted'.
+    """
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        remember_blacklisted(self.payload[api_settings.JTI_CLAIM])
+        return result
+
+
+class FilteredTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = FilteredRefreshToken
+
+
+def get_token_table_sizes():
+    return {
+        "outstanding_tokens": OutstandingToken.objects.count(),
+        "blacklisted_tokens": BlacklistedToken.objects.count(),
+    }
+
+
+def prune_expired_tokens(batch_size, sleep=0):
+    """
+       Delete expired outstanding tokens (and their blacklist rows), 'batch_size' ids at a time.
+
+       Each batch is a range of primary keys deleted in its own short transaction, so the tables are never locked
+       for long. The result is saved in the database (see 'get_token_pruning_stats').
+
+       Returns: {"deleted": {...}, "sizes_before": {...}, "sizes": {...}, "seconds": ..., "finished_at": ...}
+    """
+
+    started = time.monotonic()
+    now = aware_utcnow()
+    sizes_before = get_token_table_sizes()
+
+    deleted = {"outstanding_tokens": 0, "blacklisted_tokens": 0}
+    bounds = OutstandingToken.objects.aggregate(first=Min("id"), last=Max("id"))
+
+    if bounds["first"] is not None:
+        for start in range(bounds["first"], bounds["last"] + 1, batch_size):
+            with transaction.atomic():
+                _, counts = OutstandingToken.objects.filter(
+                    id__gte=start, id__lt=start + batch_size, expires_at__lte=now
+                ).delete()
+
+            deleted["outstanding_tokens"] += counts.get(OutstandingToken._meta.label, 0)
+            deleted["blacklisted_tokens"] += counts.get(BlacklistedToken._meta.label, 0)
+
+            if sleep:
+                time.sleep(sleep)
+
+    result = {
+        "deleted": deleted,
+        "sizes_before": sizes_before,
+        "sizes": get_token_table_sizes(),
+        "seconds": round(time.monotonic() - started, 3),
+        "finished_at": aware_utcnow().isoformat(),
+    }
+    # a single row, so every process (Ex: the web workers) sees the last result.
+    TokenPruning.objects.update_or_create(pk=1, defaults={"result": result})
+    return result
+
+
+def get_token_pruning_stats():
+    """
+       Get the result of the last pruning of expired tokens (None if it never ran).
+    """
+
+    pruning = TokenPruning.objects.filter(pk=1).first()
+    return pruning.result if pruning is not None else None
@@ -12,6 +12,14 @@ urlpatterns = [
    # E: /api/users/1/ <-- 1: user_id
    path("<int:user_id>/", views.user_controller),
 
+   # GET a page of the books uploaded by a user
+   # Ex: /api/users/1/books/?cursor=...
+   path("<int:user_id>/books/", views.user_books_controller),
+
+   # GET a page of the wishlist of a user, add (POST) or remove (DELETE) books in bulk
+   # Ex: /api/users/1/wishlist/?cursor=...
+   path("<int:user_id>/wishlist/", views.user_wishlist_controller),
+
    # Endpoints to access auth tokens
    # Ex: /api/users/token/
    path('token/', views.MyTokenObtainPairView.as_view(), name='token_obtain_pair'),
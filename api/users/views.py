@@ -1,4 +1,7 @@
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
 
 from rest_framework.response import Response
@@ -7,9 +10,55 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser
 from rest_framework_simplejwt.views import TokenObtainPairView
 
-from users.models import Tag, User
-from users.serializers import CompleteUserDetailSerializer, UserImageSerializer, UserSerializer, MyTokenObtainPairSerializer
-from api_config.utils.cloudinary_utils import delete_image, upload_image
+from users.models import User
+from books.models import Book, WishList
+from users.reference_data import REFERENCE_DATA_VERSION_KEY, get_tag_ids, get_tags
+from books.recommendations import queue_user_recommendations
+from users.serializers import BookSerializer, CompleteUserDetailSerializer, UserImageSerializer, UserSerializer, WishListSerializer, MyTokenObtainPairSerializer
+from api_config.utils.cloudinary_utils import ImageUploadError, InvalidImageError, delete_image, delete_images, upload_images
+from api_config.utils.cache_utils import bump_catalogue_version, get_version
+from api_config.utils.m2m_utils import update_m2m
+from api_config.utils.pagination import InvalidCursor, paginate_by_cursor
+from api_config.utils.etag_utils import is_not_modified, make_etag, not_modified_response
+
+
+def upload_user_images(data):
+    """
+        Upload the 'profile_image' and 'cover_image' sent (with their variants) concurrently.
+
+        Returns: list of the uploaded images with their 'type' ('user' is set before saving them).
+        Raises: 'InvalidImageError' if a file isn't an image, 'ImageUploadError' if the upload failed
+        (nothing is left in storage).
+    """
+
+    image_types = [image_type for image_type in ["profile", "cover"] if data.get(f"{image_type}_image", None) is not None]
+    uploaded = upload_images([data.get(f"{image_type}_image") for image_type in image_types], "user-images/")
+    return [{**image, "type": image_type} for image_type, image in zip(image_types, uploaded)]
+
+
+def image_error_response(error):
+    # a file that isn't an image is rejected, a failed upload can be retried.
+    if isinstance(error, InvalidImageError):
+        return Response(data={"error": {"message": "Upload valid images"}}, status=400)
+    return Response(data={"error": {"message": "Couldn't upload images, try again"}}, status=502)
+
+
+def is_duplicate_email(error):
+    """
+        Check if an 'IntegrityError' comes from the unique index on 'lower(email)' or the unique key of 'email'.
+    """
+
+    # Postgres names the violated constraint, SQLite only has it in the message.
+    constraint = getattr(getattr(error.__cause__, "diag", None), "constraint_name", None)
+    message = constraint or str(error)
+    return "unique_user_email_lower" in message or "email" in message
+
+
+def integrity_error_response(error):
+    # only a duplicate email means the user exists, other violations (Ex: unknown gender) are invalid details.
+    if is_duplicate_email(error):
+        return Response(status=400, data={"error": {"message": "User already exists"}})
+    return Response(status=400, data={"error": {"message": "Invalid user details"}})
 
 
 @api_view(["POST"])
@@ -19,42 +68,27 @@ def register(req):
         Get user details, and create user if the user doesn't exist.
     """
 
-    # check if the user already exists based on email
     # accepts form-data
-    try:
-        userFromDB = get_user_model().objects.get(
-            email__exact=req.data.get("email", None)
-        )
-        return Response(status=400, data={"error": {"message": "User already exists"}})
-    except User.DoesNotExist:
-        pass
-
     user_serializer = UserSerializer(data=req.data)
 
     # if the data is serialized successfully, save the user and send response
     if user_serializer.is_valid():
-        user = get_user_model().objects.create_user(**user_serializer.validated_data)
-       
-        # upload user profile & cover images.
-        uploaded_profile_image = req.data.get("profile_image", None)
-        uploaded_cover_image = req.data.get("cover_image", None)
-        imagesList = []
-
-        # Format images to save it in data.
-        if uploaded_profile_image is not None:
-            profile_image = upload_image(req.data.get("profile_image", None), "user-images/")
-            profile_image['user'] = user.id
-            profile_image['filename'] = profile_image['public_id']
-            profile_image['type'] = 'profile'
-            imagesList.append(profile_image)
-        
-        if uploaded_cover_image is not None:
-            cover_image = upload_image(req.data.get("cover_image", None), "user-images/")
-            cover_image['user'] = user.id
-            cover_image['filename'] = cover_image['public_id']
-            cover_image['type'] = 'cover'
-            imagesList.append(cover_image)
+        # upload user profile & cover images first, so a failed upload doesn't leave a user without them.
+        try:
+            imagesList = upload_user_images(req.data)
+        except (InvalidImageError, ImageUploadError) as error:
+            return image_error_response(error)
+
+        # a single INSERT, the unique index on 'lower(email)' rejects existing users (in any casing).
+        try:
+            with transaction.atomic():
+                user = get_user_model().objects.create_user(**user_serializer.validated_data)
+        except IntegrityError as error:
+            delete_images([image["filename"] for image in imagesList])
+            return integrity_error_response(error)
 
+        for image in imagesList:
+            image['user'] = user.id
 
         # serialize images and save to DB.
         user_image_serializer = UserImageSerializer(data=imagesList, many=True)
@@ -64,12 +98,47 @@ def register(req):
         # get user interests and save it.
         user_interests = req.data.getlist("interests", None)
         if user_interests is not None:
-            allowed_interests = Tag.objects.filter(text__in=user_interests)
-            user.interests.add(*allowed_interests)
+            user.interests.add(*get_tag_ids(user_interests))
+            queue_user_recommendations(user.id)
 
         return Response(data={"message": "User successfully registered"}, status=200)
     return Response(status=400, data={"error": {"message": user_serializer.errors}})
 
+def count_per_user(queryset):
+    """
+       Subquery counting the rows of 'queryset' that belong to the outer user (0 if none).
+    """
+
+    counts = queryset.filter(user_id=OuterRef("pk")).order_by().values("user_id").annotate(count=Count("id"))
+    return Coalesce(Subquery(counts.values("count"), output_field=IntegerField()), 0)
+
+
+def paginate_user_books(user_id, query_params):
+    """
+       A page of the books uploaded by the user (latest first), serialized.
+
+       Returns: (books, next cursor, has_more)
+    """
+
+    books, next_cursor, has_more = paginate_by_cursor(
+        Book.objects.for_profile().filter(user_id=user_id), query_params
+    )
+    return BookSerializer(books, many=True).data, next_cursor, has_more
+
+
+def paginate_user_wishlist(user_id, query_params):
+    """
+       A page of the wishlist of the user (latest added first), serialized.
+
+       Returns: (wishlist items, next cursor, has_more)
+    """
+
+    wishlist, next_cursor, has_more = paginate_by_cursor(
+        WishList.objects.for_profile().filter(user_id=user_id), query_params, keyset=("id",)
+    )
+    return WishListSerializer(wishlist, many=True).data, next_cursor, has_more
+
+
 # Get user profile
 @api_view(["GET", "PUT"])
 @permission_classes([IsAuthenticated])
@@ -78,14 +147,23 @@ def user_controller(req, **kwargs):
     # get user id
     user_id = kwargs['user_id']
 
-    # get corresponding user, return error if not found
-    user_qs = User.objects.prefetch_related("books", "interests", "wishlist", "images")
+    # get corresponding user (with interests, images and the number of books / wishlist items), return error if not found
+    user_qs = User.objects.prefetch_related("interests", "images").annotate(
+        books_count=count_per_user(Book.objects.all()),
+        wishlist_count=count_per_user(WishList.objects.all()),
+    )
     user = get_object_or_404(user_qs, pk=user_id) 
     
     # Get user profile.
     if req.method == 'GET':
         user_serializer = CompleteUserDetailSerializer(user)
-        return Response({'data': user_serializer.data })
+        data = user_serializer.data
+
+        # add the first page of books and wishlist (next pages from '/api/users/<id>/books/' and '/api/users/<id>/wishlist/').
+        data['books'], data['books_next'], _ = paginate_user_books(user_id, {})
+        data['wishlist'], data['wishlist_next'], _ = paginate_user_wishlist(user_id, {})
+
+        return Response({'data': data })
 
     # Edit user profile.
     elif req.method == 'PUT':
@@ -96,12 +174,23 @@ def user_controller(req, **kwargs):
         user_serializer = UserSerializer(user, data=req.data, partial=True)
 
         if user_serializer.is_valid():
-            user = user_serializer.save()
+            # upload new profile & cover images first, nothing is changed if the upload fails.
+            try:
+                imagesList = upload_user_images(req.data)
+            except (InvalidImageError, ImageUploadError) as error:
+                return image_error_response(error)
+
+            # the new email may belong to another user (in any casing).
+            try:
+                with transaction.atomic():
+                    user = user_serializer.save()
+            except IntegrityError as error:
+                delete_images([image["filename"] for image in imagesList])
+                return integrity_error_response(error)
 
             # get uploaded user profile & cover images.
             uploaded_profile_image = req.data.get("profile_image", None)
             uploaded_cover_image = req.data.get("cover_image", None)
-            imagesList = []
 
             # If user decides to delete profile image and cover image (or) uploads new images, delete old images.
             if (req.data.get('delete_profile_image', '') in ['True', 'true', 1, '1']) or uploaded_profile_image:
@@ -115,40 +204,96 @@ def user_controller(req, **kwargs):
                     delete_image(b[0].filename)
                     b.delete()
 
-            # If new profile image is uploaded, replace with new image.
-            if uploaded_profile_image is not None:
-                profile_image = upload_image(req.data.get("profile_image", None), "user-images/")
-                profile_image['user'] = user.id
-                profile_image['filename'] = profile_image['public_id']
-                profile_image['type'] = 'profile'
-                imagesList.append(profile_image)
-            
-            # If new cover image is uploaded, replace with new image.
-            if uploaded_cover_image is not None:
-                cover_image = upload_image(req.data.get("cover_image", None), "user-images/")
-                cover_image['user'] = user.id
-                cover_image['filename'] = cover_image['public_id']
-                cover_image['type'] = 'cover'
-                imagesList.append(cover_image) 
-
+            # Replace them with the new images.
+            for image in imagesList:
+                image['user'] = user.id
 
             # serialize images and save to DB.
             user_image_serializer = UserImageSerializer(data=imagesList, many=True)
             if user_image_serializer.is_valid():
                 user_image_serializer.save()
 
-            # Get user interests and save it.
-            user_interests = req.data.getlist("interests", None)
-            user.interests.clear()
-            if user_interests is not None:
-                allowed_interests = Tag.objects.filter(text__in = user_interests)
-                user.interests.add(*allowed_interests)
+            # Get user interests and save it (only the added/removed ones are written).
+            user_interests = req.data.getlist("interests", None) or []
+            added, removed = update_m2m(user, "interests", get_tag_ids(user_interests))
+            if added or removed:
+                queue_user_recommendations(user.id)
+
+            # name and profile image of the user are shown with their books in the feed.
+            Book.objects.filter(user_id=user.id).touch()
+            bump_catalogue_version()
 
 
             return Response(data={"data" :{"message": "User successfully updated"}}, status=200)
         return Response(status=400, data={"error": {"message": user_serializer.errors}})
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def user_books_controller(req, **kwargs):
+    user_id = kwargs['user_id']
+
+    # GET a page of books uploaded by the user (latest first).
+    if not User.objects.filter(pk=user_id).exists():
+        return Response(data={"error": {"message": "Resource not found"}}, status=404)
+
+    try:
+        books, next_cursor, has_more = paginate_user_books(user_id, req.query_params)
+    except InvalidCursor:
+        return Response(data={"error": {"message": "Invalid cursor"}}, status=400)
+
+    return Response(data={"data": {"books": books, "next": next_cursor, "has_more": has_more}}, status=200)
+
+
+@api_view(["GET", "POST", "DELETE"])
+@permission_classes([IsAuthenticated])
+def user_wishlist_controller(req, **kwargs):
+    user_id = kwargs['user_id']
+
+    # GET a page of the wishlist of the user (latest added first).
+    if req.method == "GET":
+        if not User.objects.filter(pk=user_id).exists():
+            return Response(data={"error": {"message": "Resource not found"}}, status=404)
+
+        try:
+            wishlist, next_cursor, has_more = paginate_user_wishlist(user_id, req.query_params)
+        except InvalidCursor:
+            return Response(data={"error": {"message": "Invalid cursor"}}, status=400)
+
+        return Response(
+            data={"data": {"wishlist": wishlist, "next": next_cursor, "has_more": has_more}},
+            status=200,
+        )
+
+    # Only same user can edit their wishlist
+    if user_id != req.user.id:
+        return Response(data={'error': {"message": 'Unauthorized'}}, status=401)
+
+    # ids of the books to add / remove. Ex: {"books": [1, 2, 3]}
+    book_ids = req.data.get("books", None)
+    if not isinstance(book_ids, list) or not all(isinstance(book_id, int) for book_id in book_ids):
+        return Response(data={"error": {"message": "Send a list of book ids"}}, status=400)
+
+    # POST books to the wishlist in one statement (missing and own books are skipped).
+    if req.method == "POST":
+        added = WishList.objects.add_books(user_id, book_ids)
+        return Response(data={"data": {"message": "Books added to wishlist", "books": added}}, status=200)
+
+    # DELETE books from the wishlist in one statement.
+    removed = WishList.objects.remove_books(user_id, book_ids)
+    return Response(data={"data": {"message": "Books removed from wishlist", "removed": removed}}, status=200)
+
+
+@api_view(["GET"])
+def tags_controller(req):
+    # GET all the tags (book categories / user interests), served from the process cache.
+    etag = make_etag("tags", get_version(REFERENCE_DATA_VERSION_KEY))
+    if is_not_modified(req, etag):
+        return not_modified_response(etag)
+
+    return Response(data={"data": {"tags": get_tags()}}, status=200, headers={"ETag": etag})
+
+
 # Custom JWToken view
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
\ No newline at end of file